@@ -7,12 +7,14 @@ from poe2scout.com and save it to JSON files that Vercel can serve statically.
 """
 
 import asyncio
+import functools
+import html
 import json
 import logging
 import os
 import re
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -29,6 +31,42 @@ except ImportError:
     logger.error("❌ Playwright not installed. Install with: pip install playwright")
     sys.exit(1)
 
+# (currencies, currency_metadata, exchange_rates, total_pairs)
+ScrapeResult = Tuple[List[Dict], Dict[str, Dict], Dict[str, Dict[str, float]], int]
+
+# orjson writes the output files noticeably faster; stdlib json is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Dynamic currency key normalization: apostrophes are dropped via a translate
+# table, every other non-alphanumeric character becomes a word break
+_APOSTROPHE_TABLE = str.maketrans('', '', "'")
+_RE_NONALNUM = re.compile(r'[^a-zA-Z0-9\s]')
+
+# Exchange table parsing
+_RE_ROW = re.compile(r'<tr\b[^>]*>(.*?)</tr>', re.S)
+_RE_CELL = re.compile(r'<td\b[^>]*>(.*?)</td>', re.S)
+_RE_TAG = re.compile(r'<[^>]*>')
+_RE_PAIR_RATE = re.compile(r'(.+?)\s*/\s*(.+?)1\.00\s*=\s*([0-9,]+(?:\.[0-9]+)?)')
+_RE_NUMBER = re.compile(r'([0-9,]+(?:\.[0-9]+)?)')
+
+
+def score_currencies(total_volumes: List[float], best_positions: List[float]) -> List[float]:
+    """
+    Popularity score per currency: up to 50 points for volume relative to the
+    busiest currency, plus up to 50 points for appearing near the top of the table.
+    """
+    max_volume = max(total_volumes, default=1)
+    if max_volume > 0:
+        return [
+            (volume / max_volume) * 50 + max(0, 50 - position * 0.5)
+            for volume, position in zip(total_volumes, best_positions)
+        ]
+    return [max(0, 50 - position * 0.5) for position in best_positions]
+
 
 class POE2ScoutScraper:
     """Scraper for POE2Scout.com currency data"""
@@ -36,114 +74,193 @@ class POE2ScoutScraper:
     BASE_URL = "https://poe2scout.com/exchange"
     DEFAULT_LEAGUE = "Rise of the Abyssal"
     
+    # Only the exchange table is needed, so skip everything that is just presentation
+    BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'stylesheet', 'media'})
+    
+    # Static mapping for known currencies
+    _NAME_MAPPING = {
+        'Divine Orb': 'divine',
+        'Exalted Orb': 'exalted',
+        'Chaos Orb': 'chaos',
+        'Mirror of Kalandra': 'mirror',
+        'Perfect Exalted Orb': 'perfect_exalted',
+        'Orb of Annulment': 'annulment',
+        'Orb of Chance': 'chance',
+        'Perfect Chaos Orb': 'perfect_chaos',
+        'Fracturing Orb': 'fracturing',
+        'Greater Exalted Orb': 'greater_exalted',
+        "Perfect Jeweller's Orb": 'perfect_jeweller',
+        'Uncut Skill Gem (Level 20)': 'uncut_gem_20',
+        'Omen of Light': 'omen_light',
+        'Omen of Homogenising Exaltation': 'omen_homogenising',
+        'Omen of Abyssal Echoes': 'omen_abyssal',
+        'Omen of Whittling': 'omen_whittling',
+        'Omen of Chaotic Rarity': 'omen_chaotic',
+        'Omen of Amelioration': 'omen_amelioration',
+        "Rakiata's Flow": 'rakiata_flow',
+        'Talisman of Sirrius': 'talisman_sirrius',
+        "Hinekora's Lock": 'hinekora_lock',
+        "Farrul's Rune of the Chase": 'farrul_rune',
+        "Atalui's Bloodletting": 'atalui_bloodletting',
+        "Jeweller's Orb": 'jeweller',
+        'Orb of Alchemy': 'alchemy',
+        'Regal Orb': 'regal',
+        'Ancient Orb': 'ancient',
+        'Blessed Orb': 'blessed',
+        'Orb of Alteration': 'alteration',
+        'Chromatic Orb': 'chromatic',
+        'Orb of Augmentation': 'augmentation',
+        'Orb of Transmutation': 'transmutation',
+        'Glassblower\'s Bauble': 'glassblower',
+        "Gemcutter's Prism": 'gemcutter',
+        'Orb of Fusing': 'fusing',
+        'Orb of Scouring': 'scouring',
+        'Orb of Regret': 'regret',
+        'Vaal Orb': 'vaal',
+    }
+    
+    # Lowercased view of _NAME_MAPPING for case-insensitive lookups
+    _NAME_MAPPING_LOWER = {name.lower(): key for name, key in _NAME_MAPPING.items()}
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self._playwright = None
+        self._browser = None
     
-    async def scrape_currency_data(self, league: str = None) -> Tuple[List[Dict], Dict[str, Dict], Dict[str, Dict[str, float]]]:
+    async def _ensure_browser(self):
+        """Launch Chromium on first use and keep it warm for later scrapes"""
+        if self._browser is None:
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+        return self._browser
+    
+    async def close(self):
+        """Shut down the shared browser and Playwright driver"""
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def scrape_currency_data(self, league: str = None) -> ScrapeResult:
         """
         Scrape currency data from POE2Scout.com
         
+        BASE_URL takes no league parameter and serves whichever league the
+        site currently shows, so league only labels the logs.
+        
         Returns:
-            Tuple of (currencies, currency_metadata, exchange_rates)
+            Tuple of (currencies, currency_metadata, exchange_rates, total_pairs)
         """
         league = league or self.DEFAULT_LEAGUE
+        browser = await self._ensure_browser()
+        context = await browser.new_context()
+        try:
+            return await self._scrape_one(context, league)
+        finally:
+            await context.close()
+    
+    async def _scrape_one(self, context, league: str) -> ScrapeResult:
+        """Scrape the exchange table inside the given browser context"""
         
         self.logger.info(f"🎭 Starting browser automation for league: {league}")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
+        page = await context.new_page()
+        await page.route("**/*", self._block_heavy_resources)
+        
+        # Set user agent
+        await page.set_extra_http_headers({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        
+        # The exchange page has no league selector, so this shows the site's current league
+        self.logger.info(f"🌐 Navigating to {self.BASE_URL}")
+        await page.goto(self.BASE_URL, wait_until='domcontentloaded', timeout=15000)
+        
+        # Wait for table to load, then for JavaScript to populate its rows
+        await page.wait_for_selector('table', timeout=10000)
+        await page.wait_for_function(
+            "() => document.querySelectorAll('table tbody tr').length > 0",
+            timeout=10000
+        )
+        self.logger.info("✅ Table loaded successfully")
+        
+        # Pull the table body in one round-trip and parse the rows in Python
+        tbody_html = await page.inner_html('table tbody')
+        trading_pairs = self._parse_table_rows(tbody_html)
+        
+        self.logger.info(f"✅ Extracted {len(trading_pairs)} trading pairs")
+        
+        # Process the data
+        return self._process_trading_pairs(trading_pairs)
+    
+    def _parse_table_rows(self, tbody_html: str) -> List[Dict]:
+        """
+        Parse trading pairs out of the exchange table body HTML.
+        
+        Only the first two cells are read: the pair and rate cell, e.g.
+        "Divine Orb/ Exalted Orb1.00 = 139.91", and the volume cell.
+        """
+        pairs = []
+        
+        for index, row_match in enumerate(_RE_ROW.finditer(tbody_html)):
+            row_html = row_match.group(1)
+            cells = _RE_CELL.findall(row_html)
+            if len(cells) < 2:
+                continue
             
             try:
-                page = await browser.new_page()
+                # The first cell holds both the pair and its rate
+                pair_text = html.unescape(_RE_TAG.sub('', cells[0])).strip()
+                pair_match = _RE_PAIR_RATE.match(pair_text)
+                if not pair_match:
+                    continue
                 
-                # Set user agent
-                await page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                })
+                from_currency = pair_match.group(1).strip()
+                to_currency = pair_match.group(2).strip()
+                rate = float(pair_match.group(3).replace(',', ''))
                 
-                self.logger.info(f"🌐 Navigating to {self.BASE_URL}")
-                await page.goto(self.BASE_URL, wait_until='domcontentloaded', timeout=15000)
+                # Parse volume
+                volume = 0.0
+                volume_match = _RE_NUMBER.search(_RE_TAG.sub('', cells[1]))
+                if volume_match:
+                    volume = float(volume_match.group(1).replace(',', ''))
                 
-                # Wait for JavaScript to load
-                await page.wait_for_timeout(3000)
-                
-                # Wait for table to load
-                await page.wait_for_selector('table', timeout=10000)
-                self.logger.info("✅ Table loaded successfully")
-                
-                # Extract trading pairs
-                trading_pairs = await page.evaluate('''
-                    () => {
-                        const pairs = [];
-                        const rows = document.querySelectorAll('table tbody tr');
-                        
-                        rows.forEach((row, index) => {
-                            try {
-                                const cells = row.querySelectorAll('td');
-                                if (cells.length >= 2) {
-                                    const fullRowText = row.textContent.trim();
-                                    const rateText = cells[0].textContent.trim();
-                                    const volumeText = cells[1].textContent.trim();
-                                    
-                                    // Parse: "Divine Orb/ Exalted Orb1.00 = 139.913,608,138"
-                                    const pairMatch = fullRowText.match(/^(.+?)\\s*\\/\\s*(.+?)1\\.00/);
-                                    const rateMatch = rateText.match(/1\\.00\\s*=\\s*([0-9,]+(?:\\.[0-9]+)?)/);
-                                    
-                                    if (pairMatch && rateMatch) {
-                                        const fromCurrency = pairMatch[1].trim();
-                                        const toCurrency = pairMatch[2].trim();
-                                        const rate = parseFloat(rateMatch[1].replace(/,/g, ''));
-                                        
-                                        // Parse volume
-                                        let volumeValue = 0;
-                                        const volumeMatch = volumeText.match(/([0-9,]+(?:\\.[0-9]+)?)/);
-                                        if (volumeMatch) {
-                                            volumeValue = parseFloat(volumeMatch[1].replace(/,/g, ''));
-                                        }
-                                        
-                                        if (rate > 0 && fromCurrency && toCurrency) {
-                                            pairs.push({
-                                                from: fromCurrency,
-                                                to: toCurrency,
-                                                rate: rate,
-                                                volume: volumeValue,
-                                                position: index + 1
-                                            });
-                                        }
-                                    }
-                                }
-                            } catch (e) {
-                                console.log('Error parsing row:', e);
-                            }
-                        });
-                        
-                        return pairs;
-                    }
-                ''')
-                
-                self.logger.info(f"✅ Extracted {len(trading_pairs)} trading pairs")
-                
-                # Process the data
-                currencies, currency_metadata, exchange_rates = self._process_trading_pairs(trading_pairs)
-                
-                return currencies, currency_metadata, exchange_rates
-                
-            finally:
-                await browser.close()
+                if rate > 0 and from_currency and to_currency:
+                    pairs.append({
+                        'from': from_currency,
+                        'to': to_currency,
+                        'rate': rate,
+                        'volume': volume,
+                        'position': index + 1
+                    })
+            except ValueError as e:
+                self.logger.debug(f"Error parsing row {index}: {e}")
+        
+        return pairs
     
-    def _process_trading_pairs(self, trading_pairs: List[Dict]) -> Tuple[List[Dict], Dict[str, Dict], Dict[str, Dict[str, float]]]:
+    async def _block_heavy_resources(self, route):
+        """Abort requests for resources that don't affect the table data"""
+        if route.request.resource_type in self.BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    def _process_trading_pairs(self, trading_pairs: List[Dict]) -> ScrapeResult:
         """Process raw trading pairs into structured data"""
         
-        currency_metadata = {}
-        exchange_rates = {}
+        # Per-currency stats are kept as parallel columns indexed via key_index,
+        # so scoring and ranking can run over whole columns at once
+        key_index = {}
+        keys = []
+        names = []
+        resolved = []
         
-        # Build metadata from all discovered currencies
+        # First pass: map names to keys and enumerate currency slots
         for pair in trading_pairs:
             from_currency = pair['from']
             to_currency = pair['to']
-            volume = pair['volume']
-            position = pair['position']
-            rate = pair['rate']
             
             # Map to internal keys
             from_key = self._map_currency_name(from_currency)
@@ -152,129 +269,107 @@ class POE2ScoutScraper:
             if not from_key or not to_key or from_key == to_key:
                 continue
             
-            # Update metadata for both currencies
-            for currency_name, currency_key in [(from_currency, from_key), (to_currency, to_key)]:
-                if currency_key not in currency_metadata:
-                    currency_metadata[currency_key] = {
-                        'name': currency_name,
-                        'key': currency_key,
-                        'total_volume': 0,
-                        'pair_count': 0,
-                        'best_position': float('inf'),
-                        'popularity_score': 0
-                    }
-                
-                currency_metadata[currency_key]['total_volume'] += volume
-                currency_metadata[currency_key]['pair_count'] += 1
-                currency_metadata[currency_key]['best_position'] = min(
-                    currency_metadata[currency_key]['best_position'], position
-                )
+            for currency_name, currency_key in ((from_currency, from_key), (to_currency, to_key)):
+                if currency_key not in key_index:
+                    key_index[currency_key] = len(keys)
+                    keys.append(currency_key)
+                    names.append(currency_name)
             
-            # Store exchange rate
-            if from_key not in exchange_rates:
-                exchange_rates[from_key] = {}
-            exchange_rates[from_key][to_key] = rate
+            resolved.append((from_key, to_key, pair))
         
-        # Calculate popularity scores
-        max_volume = max([meta['total_volume'] for meta in currency_metadata.values()], default=1)
+        total_volumes = [0] * len(keys)
+        pair_counts = [0] * len(keys)
+        best_positions = [float('inf')] * len(keys)
+        exchange_rates = {from_key: {} for from_key, _, _ in resolved}
+        total_pairs = 0
         
-        for currency_key, metadata in currency_metadata.items():
-            volume_score = (metadata['total_volume'] / max_volume) * 50 if max_volume > 0 else 0
-            position_score = max(0, 50 - metadata['best_position'] * 0.5)
-            metadata['popularity_score'] = volume_score + position_score
+        # Second pass: accumulate stats into the preallocated columns
+        for from_key, to_key, pair in resolved:
+            volume = pair['volume']
+            position = pair['position']
+            
+            for idx in (key_index[from_key], key_index[to_key]):
+                total_volumes[idx] += volume
+                pair_counts[idx] += 1
+                if position < best_positions[idx]:
+                    best_positions[idx] = position
+            
+            to_rates = exchange_rates[from_key]
+            if to_key not in to_rates:
+                total_pairs += 1
+            to_rates[to_key] = pair['rate']
         
-        # Create currencies list sorted by popularity
-        currencies = []
-        sorted_currencies = sorted(
-            currency_metadata.items(),
-            key=lambda x: x[1]['popularity_score'],
-            reverse=True
-        )
+        # Calculate popularity scores column-wise
+        popularity_scores = score_currencies(total_volumes, best_positions)
         
-        for currency_key, metadata in sorted_currencies:
-            currencies.append({
-                'id': currency_key,
-                'name': metadata['name'],
-                'volume': int(metadata['total_volume']),
-                'pair_count': metadata['pair_count'],
-                'popularity_score': round(metadata['popularity_score'], 2),
+        currency_metadata = {
+            key: {
+                'name': names[idx],
+                'key': key,
+                'total_volume': total_volumes[idx],
+                'pair_count': pair_counts[idx],
+                'best_position': best_positions[idx],
+                'popularity_score': popularity_scores[idx]
+            }
+            for idx, key in enumerate(keys)
+        }
+        
+        # Create currencies list sorted by popularity
+        ranking = sorted(range(len(keys)), key=popularity_scores.__getitem__, reverse=True)
+        currencies = [
+            {
+                'id': keys[idx],
+                'name': names[idx],
+                'volume': int(total_volumes[idx]),
+                'pair_count': pair_counts[idx],
+                'popularity_score': round(popularity_scores[idx], 2),
                 'supported': True
-            })
+            }
+            for idx in ranking
+        ]
         
         # Log top currencies
         self.logger.info("🏆 Top 10 currencies by popularity:")
         for i, curr in enumerate(currencies[:10]):
             self.logger.info(f"  {i+1}. {curr['name']}: score={curr['popularity_score']}, volume={curr['volume']}")
         
-        return currencies, currency_metadata, exchange_rates
+        return currencies, currency_metadata, exchange_rates, total_pairs
     
-    def _map_currency_name(self, poe2scout_name: str) -> Optional[str]:
-        """Map POE2Scout names to internal currency keys"""
-        
-        # Static mapping for known currencies
-        name_mapping = {
-            'Divine Orb': 'divine',
-            'Exalted Orb': 'exalted',
-            'Chaos Orb': 'chaos',
-            'Mirror of Kalandra': 'mirror',
-            'Perfect Exalted Orb': 'perfect_exalted',
-            'Orb of Annulment': 'annulment',
-            'Orb of Chance': 'chance',
-            'Perfect Chaos Orb': 'perfect_chaos',
-            'Fracturing Orb': 'fracturing',
-            'Greater Exalted Orb': 'greater_exalted',
-            "Perfect Jeweller's Orb": 'perfect_jeweller',
-            'Uncut Skill Gem (Level 20)': 'uncut_gem_20',
-            'Omen of Light': 'omen_light',
-            'Omen of Homogenising Exaltation': 'omen_homogenising',
-            'Omen of Abyssal Echoes': 'omen_abyssal',
-            'Omen of Whittling': 'omen_whittling',
-            'Omen of Chaotic Rarity': 'omen_chaotic',
-            'Omen of Amelioration': 'omen_amelioration',
-            "Rakiata's Flow": 'rakiata_flow',
-            'Talisman of Sirrius': 'talisman_sirrius',
-            "Hinekora's Lock": 'hinekora_lock',
-            "Farrul's Rune of the Chase": 'farrul_rune',
-            "Atalui's Bloodletting": 'atalui_bloodletting',
-            "Jeweller's Orb": 'jeweller',
-            'Orb of Alchemy': 'alchemy',
-            'Regal Orb': 'regal',
-            'Ancient Orb': 'ancient',
-            'Blessed Orb': 'blessed',
-            'Orb of Alteration': 'alteration',
-            'Chromatic Orb': 'chromatic',
-            'Orb of Augmentation': 'augmentation',
-            'Orb of Transmutation': 'transmutation',
-            'Glassblower\'s Bauble': 'glassblower',
-            "Gemcutter's Prism": 'gemcutter',
-            'Orb of Fusing': 'fusing',
-            'Orb of Scouring': 'scouring',
-            'Orb of Regret': 'regret',
-            'Vaal Orb': 'vaal',
-        }
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _map_currency_name(poe2scout_name: str) -> Optional[str]:
+        """Map POE2Scout names to internal currency keys (memoized per name)"""
         
         # Try exact match
-        if poe2scout_name in name_mapping:
-            return name_mapping[poe2scout_name]
+        key = POE2ScoutScraper._NAME_MAPPING.get(poe2scout_name)
+        if key is not None:
+            return key
         
         # Try case-insensitive match
-        poe2scout_lower = poe2scout_name.lower()
-        for display_name, key in name_mapping.items():
-            if display_name.lower() == poe2scout_lower:
-                return key
+        key = POE2ScoutScraper._NAME_MAPPING_LOWER.get(poe2scout_name.lower())
+        if key is not None:
+            return key
         
         # Dynamic mapping for unknown currencies
-        name_clean = re.sub(r"[''']", "", poe2scout_name)
-        name_clean = re.sub(r'[^a-zA-Z0-9\s]', ' ', name_clean)
-        name_clean = re.sub(r'\s+', ' ', name_clean.strip())
+        name_clean = _RE_NONALNUM.sub(' ', poe2scout_name.translate(_APOSTROPHE_TABLE))
         
-        words = name_clean.lower().split()
-        dynamic_key = '_'.join(words)
+        # split() collapses and strips whitespace in the same pass
+        dynamic_key = '_'.join(name_clean.lower().split())
         
-        self.logger.debug(f"Dynamic mapping: {poe2scout_name} -> {dynamic_key}")
+        logger.debug(f"Dynamic mapping: {poe2scout_name} -> {dynamic_key}")
         return dynamic_key
 
 
+def write_json(path: Path, data: Dict) -> None:
+    """Write data to path as indented JSON, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
 async def main():
     """Main function to run the scraper"""
     
@@ -288,13 +383,14 @@ async def main():
     
     logger.info(f"📁 Output directory: {output_dir}")
     
+    scraper = POE2ScoutScraper()
+    
     try:
         # Scrape data
-        scraper = POE2ScoutScraper()
-        currencies, currency_metadata, exchange_rates = await scraper.scrape_currency_data()
+        currencies, currency_metadata, exchange_rates, total_pairs = await scraper.scrape_currency_data()
         
         # Prepare output data
-        timestamp = datetime.utcnow().isoformat() + 'Z'
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
         
         currencies_data = {
             'currencies': currencies,
@@ -316,7 +412,7 @@ async def main():
                 'league': scraper.DEFAULT_LEAGUE,
                 'fetched_at': timestamp,
                 'ttl_seconds': 300,
-                'total_pairs': sum(len(pairs) for pairs in exchange_rates.values())
+                'total_pairs': total_pairs
             }
         }
         
@@ -324,12 +420,10 @@ async def main():
         currencies_file = output_dir / 'currencies.json'
         rates_file = output_dir / 'rates.json'
         
-        with open(currencies_file, 'w') as f:
-            json.dump(currencies_data, f, indent=2)
+        write_json(currencies_file, currencies_data)
         logger.info(f"✅ Wrote currencies data to {currencies_file}")
         
-        with open(rates_file, 'w') as f:
-            json.dump(rates_data, f, indent=2)
+        write_json(rates_file, rates_data)
         logger.info(f"✅ Wrote exchange rates to {rates_file}")
         
         # Summary
@@ -351,6 +445,9 @@ async def main():
         import traceback
         traceback.print_exc()
         return 1
+    
+    finally:
+        await scraper.close()
 
 
 if __name__ == "__main__":
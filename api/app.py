@@ -9,21 +9,43 @@ This backend provides REST APIs for:
 Frontend becomes a thin client that just displays data from these APIs.
 """
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from typing import Dict, List, Optional
 import logging
 import asyncio
+import os
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 
 from models.rates import CurrencyRateMatrix
 from models.arbitrage import ArbitrageFinder
 from services.poe2scout import POE2ScoutService
+from services.http_pool import close_scout_client
+from services.browser_pool import close_browser
 
+# orjson encodes the float-heavy rate and arbitrage payloads in C;
+# fall back to Starlette's json-based response without it
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as APIResponse
+except ImportError:
+    APIResponse = JSONResponse
 
-# Global cache for rate data
-rate_cache: Dict[str, CurrencyRateMatrix] = {}
+
+# Global cache for rate data; expired entries stay to be served while refreshing.
+# Keys come from the request, so entries are kept oldest-first and, on every
+# write, those older than RATE_CACHE_MAX_AGE or beyond RATE_CACHE_MAX_KEYS are
+# dropped (see store_rates)
+RATE_CACHE_MAX_KEYS = 32
+RATE_CACHE_MAX_AGE = 3600.0
+rate_cache: Dict[str, CurrencyRateMatrix] = OrderedDict()
+
+# Background refreshes started for expired cache entries, one per cache key
+refresh_tasks: Dict[str, asyncio.Task] = {}
 
 
 @asynccontextmanager
@@ -45,6 +67,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🔄 PoE2 Arbitrage Backend shutting down...")
+    await close_scout_client()
+    await close_browser()
 
 
 # Create FastAPI application
@@ -52,18 +76,27 @@ app = FastAPI(
     title="PoE2 Currency Arbitrage API",
     description="Backend API for Path of Exile 2 currency arbitrage calculations with live market data",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=APIResponse
 )
 
-# Add CORS middleware for frontend communication
+# Add CORS middleware for frontend communication. Set CORS_ORIGINS to a
+# comma-separated allowlist in production; credentials are only allowed
+# for pinned origins, since browsers reject them alongside a wildcard
+CORS_ORIGINS = [origin.strip() for origin in os.getenv('CORS_ORIGINS', '*').split(',') if origin.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
-    allow_credentials=True,
-    allow_methods=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_credentials="*" not in CORS_ORIGINS,
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
+# Compress the large JSON responses (rate matrix, price table, arbitrage
+# steps); small ones like the root listing stay below minimum_size
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 logger = logging.getLogger(__name__)
 
 
@@ -71,7 +104,11 @@ logger = logging.getLogger(__name__)
 
 async def get_rate_data(league: str, top_percentage: float = 0.8) -> CurrencyRateMatrix:
     """
-    Get rate data for a league, using cache if available and not expired.
+    Get rate data for a league, using cache if available.
+    
+    Expired data is still returned straight away while a background refresh
+    replaces it, so callers only wait on a fetch when nothing is cached and
+    a failing upstream leaves the last good rates in service.
     """
     cache_key = f"{league.lower()}_{top_percentage}"
     
@@ -79,16 +116,17 @@ async def get_rate_data(league: str, top_percentage: float = 0.8) -> CurrencyRat
     if cache_key in rate_cache:
         cached_rates = rate_cache[cache_key]
         if not cached_rates.metadata.is_expired():
-            logger.debug(f"Using cached rates for {league} (top {top_percentage*100:.0f}%)")
-            return cached_rates
+            logger.debug("Using cached rates for %s (top %.0f%%)", league, top_percentage * 100)
         else:
-            logger.debug(f"Cached rates for {league} are expired")
+            logger.debug("Cached rates for %s are expired, serving them while refreshing", league)
+            schedule_refresh(cache_key, league, top_percentage)
+        return cached_rates
     
     # Fetch fresh data
     logger.info(f"Fetching fresh rates for {league} (top {top_percentage*100:.0f}% currencies)")
     async with POE2ScoutService() as service:
         fresh_rates = await service.fetch_currency_rates(league, top_percentage)
-        rate_cache[cache_key] = fresh_rates
+        store_rates(cache_key, fresh_rates)
         return fresh_rates
 
 
@@ -98,11 +136,73 @@ async def refresh_rate_data(league: str, top_percentage: float = 0.8) -> Currenc
     
     logger.info(f"Force refreshing rates for {league} (top {top_percentage*100:.0f}% currencies)")
     async with POE2ScoutService() as service:
-        fresh_rates = await service.fetch_currency_rates(league, top_percentage)
-        rate_cache[cache_key] = fresh_rates
+        fresh_rates = await service.fetch_currency_rates(league, top_percentage, force_refresh=True)
+        store_rates(cache_key, fresh_rates)
         return fresh_rates
 
 
+def store_rates(cache_key: str, rates: CurrencyRateMatrix) -> None:
+    """Cache rates, evicting entries past RATE_CACHE_MAX_AGE and the oldest beyond the cap"""
+    rate_cache[cache_key] = rates
+    rate_cache.move_to_end(cache_key)
+    now = time.monotonic()
+    while rate_cache:
+        oldest_key, oldest = next(iter(rate_cache.items()))
+        if len(rate_cache) <= RATE_CACHE_MAX_KEYS and now - oldest.metadata.fetched_monotonic < RATE_CACHE_MAX_AGE:
+            break
+        del rate_cache[oldest_key]
+
+
+def schedule_refresh(cache_key: str, league: str, top_percentage: float) -> None:
+    """Start a background refresh for an expired cache entry unless one is running"""
+    task = refresh_tasks.get(cache_key)
+    if task is None or task.done():
+        task = refresh_tasks[cache_key] = asyncio.create_task(background_refresh(league, top_percentage))
+        
+        def forget(done: asyncio.Task) -> None:
+            # A newer refresh may already hold the slot
+            if refresh_tasks.get(cache_key) is done:
+                del refresh_tasks[cache_key]
+        
+        task.add_done_callback(forget)
+
+
+async def background_refresh(league: str, top_percentage: float) -> None:
+    """Refresh rates, keeping the stale entry if POE2 Scout cannot be reached"""
+    try:
+        await refresh_rate_data(league, top_percentage)
+    except Exception as e:
+        logger.warning(f"⚠️  Background refresh failed for {league}, serving stale rates: {str(e)}")
+
+
+def cache_headers(rates: CurrencyRateMatrix) -> Dict[str, str]:
+    """Caching headers for a response built from one rates snapshot"""
+    if rates.metadata.is_expired():
+        # Served from the stale cache while a refresh runs
+        return {
+            "Cache-Control": "max-age=0",
+            "ETag": f'"{rates.metadata.fetched_at.isoformat()}"',
+            "X-Cache-Status": "stale"
+        }
+    return {
+        "Cache-Control": f"max-age={rates.metadata.ttl_seconds}",
+        "ETag": f'"{rates.metadata.fetched_at.isoformat()}"'
+    }
+
+
+def not_modified(request: Request, headers: Dict[str, str]) -> Optional[Response]:
+    """
+    A bodiless 304 if the client already holds this ETag, else None.
+    The ETag only tracks the snapshot; the URL (with its query) tells responses apart.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or headers["ETag"] in tags:
+            return Response(status_code=304, headers=headers)
+    return None
+
+
 # === API Endpoints ===
 
 @app.get("/")
@@ -124,6 +224,7 @@ async def root():
 @app.get("/api/rates/{league}")
 async def get_rates(
     league: str,
+    request: Request,
     top_percentage: float = Query(0.8, ge=0.1, le=1.0, description="Percentage of top currencies to include")
 ):
     """
@@ -133,13 +234,12 @@ async def get_rates(
     """
     try:
         rates = await get_rate_data(league, top_percentage)
-        return JSONResponse(
-            content=rates.to_dict(),
-            headers={
-                "Cache-Control": f"max-age={rates.metadata.ttl_seconds}",
-                "ETag": f'"{rates.metadata.fetched_at.isoformat()}"'
-            }
-        )
+        headers = cache_headers(rates)
+        # Unchanged snapshot: skip serializing the matrix altogether
+        cached = not_modified(request, headers)
+        if cached:
+            return cached
+        return APIResponse(content=rates.to_dict(), headers=headers)
     except Exception as e:
         logger.error(f"Error fetching rates for {league}: {str(e)}")
         raise HTTPException(
@@ -151,6 +251,8 @@ async def get_rates(
 @app.get("/api/arbitrage/{league}")
 async def get_arbitrage_opportunities(
     league: str,
+    request: Request,
+    response: Response,
     starting_currency: str = Query("chaos", description="Starting currency for arbitrage"),
     amount: float = Query(100.0, gt=0, description="Starting amount"),
     min_profit: float = Query(0.01, ge=0, description="Minimum profit percentage"),
@@ -168,12 +270,19 @@ async def get_arbitrage_opportunities(
         rates = await get_rate_data(league, top_percentage)
         
         # Validate starting currency
-        if starting_currency not in rates.SUPPORTED_CURRENCIES:
+        if not rates.is_supported(starting_currency):
             raise HTTPException(
                 status_code=400,
                 detail=f"Unsupported currency: {starting_currency}. Supported: {rates.SUPPORTED_CURRENCIES}"
             )
         
+        # Same snapshot and query: the client's copy is still current
+        headers = cache_headers(rates)
+        cached = not_modified(request, headers)
+        if cached:
+            return cached
+        response.headers.update(headers)
+        
         # Configure arbitrage finder
         finder = ArbitrageFinder(
             min_profit_percentage=min_profit,
@@ -182,8 +291,9 @@ async def get_arbitrage_opportunities(
             max_results=max_results
         )
         
-        # Find opportunities
-        opportunities = finder.find_opportunities(rates, starting_currency, amount)
+        # Find opportunities on a worker thread so the event loop keeps serving
+        # other requests; the scan is NumPy-bound and releases the GIL
+        opportunities = await asyncio.to_thread(finder.find_opportunities, rates, starting_currency, amount)
         
         # Convert to dict format
         results = [op.to_dict() for op in opportunities]
@@ -222,6 +332,8 @@ async def get_arbitrage_opportunities(
 @app.get("/api/prices/{league}")
 async def get_price_table(
     league: str,
+    request: Request,
+    response: Response,
     base_currency: str = Query("exalted", description="Base currency for price table"),
     top_percentage: float = Query(0.8, ge=0.1, le=1.0, description="Percentage of top currencies to include")
 ):
@@ -233,12 +345,18 @@ async def get_price_table(
     try:
         rates = await get_rate_data(league, top_percentage)
         
-        if base_currency not in rates.SUPPORTED_CURRENCIES:
+        if not rates.is_supported(base_currency):
             raise HTTPException(
                 status_code=400,
                 detail=f"Unsupported base currency: {base_currency}. Supported: {rates.SUPPORTED_CURRENCIES}"
             )
         
+        headers = cache_headers(rates)
+        cached = not_modified(request, headers)
+        if cached:
+            return cached
+        response.headers.update(headers)
+        
         price_table = rates.get_price_table(base_currency)
         
         return {
@@ -333,6 +451,8 @@ async def get_supported_leagues():
 
 @app.get("/api/currencies")
 async def get_supported_currencies(
+    request: Request,
+    response: Response,
     league: str = Query("Rise of the Abyssal", description="League to get currencies for"),
     top_percentage: float = Query(0.8, ge=0.1, le=1.0, description="Percentage of top currencies to include"),
     force_refresh: bool = Query(False, description="Force refresh currency data")
@@ -352,6 +472,12 @@ async def get_supported_currencies(
         else:
             rates = await get_rate_data(league, top_percentage)
         
+        headers = cache_headers(rates)
+        cached = not_modified(request, headers)
+        if cached:
+            return cached
+        response.headers.update(headers)
+        
         # Return currency information including popularity data
         currencies = []
         for currency_id in rates.SUPPORTED_CURRENCIES:
@@ -423,7 +549,7 @@ async def test_arbitrage_with_sample_data(
         rates = CurrencyRateMatrix.create_test_data()
         
         # Validate starting currency
-        if starting_currency not in rates.SUPPORTED_CURRENCIES:
+        if not rates.is_supported(starting_currency):
             raise HTTPException(
                 status_code=400,
                 detail=f"Unsupported currency: {starting_currency}. Supported: {rates.SUPPORTED_CURRENCIES}"
@@ -437,8 +563,9 @@ async def test_arbitrage_with_sample_data(
             max_results=max_results
         )
         
-        # Find opportunities
-        opportunities = finder.find_opportunities(rates, starting_currency, amount)
+        # Find opportunities on a worker thread so the event loop keeps serving
+        # other requests; the scan is NumPy-bound and releases the GIL
+        opportunities = await asyncio.to_thread(finder.find_opportunities, rates, starting_currency, amount)
         
         # Convert to dict format
         results = [op.to_dict() for op in opportunities]
@@ -494,10 +621,16 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
+    # WORKERS > 1 for production; each worker keeps its own rate cache.
+    # Auto-reload is a development convenience and only works with one worker
+    workers = int(os.getenv('WORKERS', '1'))
     uvicorn.run(
         "app:app", 
         host="0.0.0.0", 
         port=8000, 
-        reload=True,
+        workers=workers,
+        reload=workers == 1 and os.getenv('RELOAD', '1') == '1',
+        loop="auto",  # uvloop when installed (uvicorn[standard]), else asyncio
+        http="auto",  # httptools when installed, else h11
         log_level="info"
     )
@@ -2,94 +2,163 @@ from http.server import BaseHTTPRequestHandler
 import json
 import urllib.parse
 import asyncio
+import concurrent.futures
+import heapq
 import logging
 import sys
 import os
+import threading
+import time
+from collections import OrderedDict
+from operator import itemgetter
 from typing import Dict, Optional
 
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+    _loads = json.loads
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_POPULARITY_SCORE = itemgetter('popularity_score')
+_PROFIT_PERCENTAGE = itemgetter('profit_percentage')
+
 try:
     import httpx
     HTTPX_AVAILABLE = True
-    print("✅ HTTP client available for live data fetching")
+    logger.debug("✅ HTTP client available for live data fetching")
 except ImportError as e:
-    print(f"⚠️ HTTP client not available: {e}")
+    logger.warning(f"⚠️ HTTP client not available: {e}")
     HTTPX_AVAILABLE = False
 
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        # Set CORS headers
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        
-        # Parse path and query parameters
-        parsed_path = urllib.parse.urlparse(self.path)
-        path = parsed_path.path
-        query_params = urllib.parse.parse_qs(parsed_path.query)
-        
-        # Route handlers
-        if path == '/api/health':
-            response = {"status": "healthy", "source": "fallback"}
-        elif path == '/api/currencies':
-            response = self.handle_currencies_endpoint(query_params)
-        elif path.startswith('/api/arbitrage/'):
-            # Extract league from path like /api/arbitrage/Rise%20of%20the%20Abyssal
-            league = urllib.parse.unquote(path.split('/api/arbitrage/')[-1])
-            response = self.handle_arbitrage_endpoint(league, query_params)
-        else:
-            response = {"message": "PoE2 Arbitrage Calculator API", "path": self.path, "available_endpoints": ["/api/health", "/api/currencies", "/api/arbitrage/{league}"]}
-        
-        self.wfile.write(json.dumps(response).encode())
+# One event loop for the lifetime of the process, running in a daemon thread,
+# so requests don't pay for creating and tearing down a loop each time. It is
+# started on first use, so importing this module has no side effects.
+ASYNC_HANDLER_TIMEOUT = 30.0
+_LOOP = None
+_LOOP_LOCK = threading.Lock()
+
+def _get_loop():
+    """Return the background loop, starting its thread on first use"""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, daemon=True).start()
+    return _LOOP
+
+def run_on_loop(coro):
+    """Schedule a coroutine on the background loop, returning a concurrent Future"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+# Shared HTTP client so keep-alive connections to poe2scout.com are reused.
+# Its connections belong to whichever loop first uses them, so it is created
+# lazily and only ever driven from _LOOP (see run_on_loop).
+_CLIENT = None
+
+def _get_client():
+    """Return the shared poe2scout.com client; call only from _LOOP"""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = httpx.AsyncClient(
+            timeout=httpx.Timeout(15.0),
+            headers={
+                'User-Agent': 'Mozilla/5.0 (compatible; poe2-arbitrage-calculator/1.0)'
+            },
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        )
+    return _CLIENT
+
+# poe2scout snapshots only change every few minutes, so parsed SnapshotPairs
+# payloads are reused per league for a short while: {league: (fetched_at, pairs)}.
+# League comes straight from the request, so entries are kept oldest-first and
+# expired or surplus ones are dropped on every write (see _store_pairs).
+PAIRS_CACHE_TTL = 60.0
+PAIRS_CACHE_MAX_LEAGUES = 8
+_PAIRS_CACHE = OrderedDict()
+
+# Rate matrices derived from the cached pairs, so repeated arbitrage queries
+# skip the extraction: {league: (pairs, (index, matrix, currency_names))}.
+# An entry is stale as soon as _PAIRS_CACHE holds a different pairs object,
+# and it only exists while its league is in _PAIRS_CACHE, so it shares that bound.
+_RATES_CACHE = {}
+
+# Downloads currently in flight, so a burst of requests for one league
+# shares a single HTTP call: {league: asyncio.Task}
+_INFLIGHT = {}
+
+def _store_pairs(league, pairs):
+    """Cache a league's pairs, evicting expired entries and the oldest beyond the cap"""
+    now = time.monotonic()
+    _PAIRS_CACHE[league] = (now, pairs)
+    _PAIRS_CACHE.move_to_end(league)
+    while _PAIRS_CACHE:
+        oldest, (fetched_at, _) = next(iter(_PAIRS_CACHE.items()))
+        if len(_PAIRS_CACHE) <= PAIRS_CACHE_MAX_LEAGUES and now - fetched_at < PAIRS_CACHE_TTL:
+            break
+        del _PAIRS_CACHE[oldest]
+        _RATES_CACHE.pop(oldest, None)
+
+# Static currencies served when live poe2scout.com data is unavailable
+FALLBACK_CURRENCIES = [
+    {"name": "Chaos Orb", "id": "chaos", "key": "chaos", "popularity": 100, "popularity_score": 100.0, "volume": 15000, "pair_count": 25},
+    {"name": "Exalted Orb", "id": "exalted", "key": "exalted", "popularity": 95, "popularity_score": 95.0, "volume": 8500, "pair_count": 22},
+    {"name": "Divine Orb", "id": "divine", "key": "divine", "popularity": 90, "popularity_score": 90.0, "volume": 5200, "pair_count": 20},
+    {"name": "Mirror of Kalandra", "id": "mirror", "key": "mirror", "popularity": 85, "popularity_score": 85.0, "volume": 150, "pair_count": 12},
+    {"name": "Orb of Annulment", "id": "orb_annulment", "key": "orb_annulment", "popularity": 80, "popularity_score": 80.0, "volume": 3200, "pair_count": 18},
+    {"name": "Jeweller's Orb", "id": "jeweller", "key": "jeweller", "popularity": 75, "popularity_score": 75.0, "volume": 12000, "pair_count": 24},
+    {"name": "Ancient Orb", "id": "ancient", "key": "ancient", "popularity": 70, "popularity_score": 70.0, "volume": 2800, "pair_count": 16},
+    {"name": "Orb of Fusing", "id": "orb_fusing", "key": "orb_fusing", "popularity": 68, "popularity_score": 68.0, "volume": 9500, "pair_count": 21},
+    {"name": "Perfect Exalted Orb", "id": "perfect_exalted", "key": "perfect_exalted", "popularity": 65, "popularity_score": 65.0, "volume": 480, "pair_count": 14},
+    {"name": "Greater Exalted Orb", "id": "greater_exalted", "key": "greater_exalted", "popularity": 60, "popularity_score": 60.0, "volume": 720, "pair_count": 15},
+]
+
+# Last formatted response timestamp: [epoch_second, text]
+_TS_CACHE = [0, '']
+
+class PoE2ScoutLiveAPI:
+    """Live currency and arbitrage data from poe2scout.com, with static fallbacks"""
     
-    def handle_currencies_endpoint(self, query_params):
+    async def handle_currencies_endpoint(self, query_params):
         """Handle /api/currencies endpoint with query parameters"""
         if HTTPX_AVAILABLE:
             try:
-                # Use async handler for live data
-                return self.run_async_handler(self._fetch_live_currencies, query_params)
+                return await self._fetch_live_currencies(query_params)
             except Exception as e:
-                print(f"⚠️ Live currencies failed: {e}")
+                logger.warning(f"⚠️ Live currencies failed: {e}")
         
         # Fallback to static currencies if HTTP client unavailable
-        currencies = [
-            {"name": "Chaos Orb", "id": "chaos", "key": "chaos", "popularity": 100, "popularity_score": 100.0, "volume": 15000, "pair_count": 25},
-            {"name": "Exalted Orb", "id": "exalted", "key": "exalted", "popularity": 95, "popularity_score": 95.0, "volume": 8500, "pair_count": 22},
-            {"name": "Divine Orb", "id": "divine", "key": "divine", "popularity": 90, "popularity_score": 90.0, "volume": 5200, "pair_count": 20},
-            {"name": "Mirror of Kalandra", "id": "mirror", "key": "mirror", "popularity": 85, "popularity_score": 85.0, "volume": 150, "pair_count": 12},
-            {"name": "Orb of Annulment", "id": "orb_annulment", "key": "orb_annulment", "popularity": 80, "popularity_score": 80.0, "volume": 3200, "pair_count": 18},
-            {"name": "Jeweller's Orb", "id": "jeweller", "key": "jeweller", "popularity": 75, "popularity_score": 75.0, "volume": 12000, "pair_count": 24},
-            {"name": "Ancient Orb", "id": "ancient", "key": "ancient", "popularity": 70, "popularity_score": 70.0, "volume": 2800, "pair_count": 16},
-            {"name": "Orb of Fusing", "id": "orb_fusing", "key": "orb_fusing", "popularity": 68, "popularity_score": 68.0, "volume": 9500, "pair_count": 21},
-            {"name": "Perfect Exalted Orb", "id": "perfect_exalted", "key": "perfect_exalted", "popularity": 65, "popularity_score": 65.0, "volume": 480, "pair_count": 14},
-            {"name": "Greater Exalted Orb", "id": "greater_exalted", "key": "greater_exalted", "popularity": 60, "popularity_score": 60.0, "volume": 720, "pair_count": 15},
-        ]
+        currencies = FALLBACK_CURRENCIES
         
         return {
             "currencies": currencies,
             "total": len(currencies),
             "source": "fallback",
-            "league": query_params.get('league', ['Standard'])[0],
-            "top_percentage": float(query_params.get('top_percentage', ['0.8'])[0]),
+            "league": query_params.get('league', 'Standard'),
+            "top_percentage": float(query_params.get('top_percentage', '0.8')),
             "fetched_at": self.get_current_time(),
             "error": "Backend unavailable - using fallback data"
         }
     
     async def _fetch_live_currencies(self, query_params):
         """Fetch live currency data from poe2scout.com API"""
-        league = query_params.get('league', ['Rise of the Abyssal'])[0]
-        top_percentage = float(query_params.get('top_percentage', ['0.8'])[0])
+        league = query_params.get('league', 'Rise of the Abyssal')
+        top_percentage = float(query_params.get('top_percentage', '0.8'))
         
-        print(f"🌐 Fetching LIVE data from poe2scout.com API for {league}")
+        logger.debug(f"🌐 Fetching LIVE data from poe2scout.com API for {league}")
         
         # Fetch live data from poe2scout's real API
         currency_pairs = await self._fetch_poe2scout_api(league)
         
         if currency_pairs:
             currencies = self._extract_currencies_from_pairs(currency_pairs, top_percentage)
-            print(f"✅ Successfully extracted {len(currencies)} currencies from poe2scout.com API")
+            logger.debug(f"✅ Successfully extracted {len(currencies)} currencies from poe2scout.com API")
             
             return {
                 "currencies": currencies,
@@ -104,109 +173,107 @@ class handler(BaseHTTPRequestHandler):
     
     async def _fetch_poe2scout_api(self, league):
         """Fetch live currency data from poe2scout.com API"""
+        cached = _PAIRS_CACHE.get(league)
+        if cached and time.monotonic() - cached[0] < PAIRS_CACHE_TTL:
+            return cached[1]
+        
+        # Concurrent requests for the same league share one download
+        task = _INFLIGHT.get(league)
+        if task is None:
+            task = _INFLIGHT[league] = asyncio.ensure_future(self._download_pairs(league))
+            task.add_done_callback(lambda _: _INFLIGHT.pop(league, None))
+        return await asyncio.shield(task)
+    
+    async def _download_pairs(self, league):
+        """Download and cache SnapshotPairs for a league, or None on failure"""
         try:
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(15.0),
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (compatible; poe2-arbitrage-calculator/1.0)'
-                }
-            ) as client:
-                url = f"https://poe2scout.com/api/currencyExchange/SnapshotPairs?league={league}"
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                print(f"✅ Fetched {len(data)} live currency pairs from poe2scout.com API")
-                return data
+            url = f"https://poe2scout.com/api/currencyExchange/SnapshotPairs?league={league}"
+            response = await _get_client().get(url)
+            response.raise_for_status()
+            data = _loads(response.content)
+            logger.debug(f"✅ Fetched {len(data)} live currency pairs from poe2scout.com API")
+            _store_pairs(league, data)
+            return data
         except Exception as e:
-            print(f"❌ Failed to fetch API data from poe2scout.com: {e}")
+            logger.error(f"❌ Failed to fetch API data from poe2scout.com: {e}")
             return None
     
     def _extract_currencies_from_pairs(self, currency_pairs, top_percentage):
         """Extract currency list from live poe2scout API currency pairs"""
-        from collections import defaultdict
+        currency_stats = {}
         
-        currency_stats = defaultdict(lambda: {
-            'name': '',
-            'id': '',
-            'volume': 0.0,
-            'pair_count': 0,
-            'icon_url': '',
-            'total_traded': 0.0
-        })
-        
-        print(f"🔍 Processing {len(currency_pairs)} live currency pairs from poe2scout API")
+        logger.debug(f"🔍 Processing {len(currency_pairs)} live currency pairs from poe2scout API")
         
         # Process each currency pair
         for pair in currency_pairs:
             try:
-                # Extract currency one
-                curr_one = pair.get('CurrencyOne', {})
-                curr_one_data = pair.get('CurrencyOneData', {})
-                
-                if curr_one.get('apiId'):
-                    id1 = curr_one['apiId']
-                    currency_stats[id1]['name'] = curr_one.get('text', id1)
-                    currency_stats[id1]['id'] = id1
-                    currency_stats[id1]['icon_url'] = curr_one.get('iconUrl', '')
-                    currency_stats[id1]['volume'] += float(curr_one_data.get('VolumeTraded', 0))
-                    currency_stats[id1]['total_traded'] += float(curr_one_data.get('ValueTraded', 0))
-                    currency_stats[id1]['pair_count'] += 1
-                
-                # Extract currency two  
-                curr_two = pair.get('CurrencyTwo', {})
-                curr_two_data = pair.get('CurrencyTwoData', {})
-                
-                if curr_two.get('apiId'):
-                    id2 = curr_two['apiId']
-                    currency_stats[id2]['name'] = curr_two.get('text', id2)
-                    currency_stats[id2]['id'] = id2
-                    currency_stats[id2]['icon_url'] = curr_two.get('iconUrl', '')
-                    currency_stats[id2]['volume'] += float(curr_two_data.get('VolumeTraded', 0))
-                    currency_stats[id2]['total_traded'] += float(curr_two_data.get('ValueTraded', 0))
-                    currency_stats[id2]['pair_count'] += 1
-                    
+                self._ingest_currency(currency_stats, pair.get('CurrencyOne', {}), pair.get('CurrencyOneData', {}))
+                self._ingest_currency(currency_stats, pair.get('CurrencyTwo', {}), pair.get('CurrencyTwoData', {}))
             except Exception as e:
-                print(f"⚠️ Error processing pair: {e}")
+                logger.debug("⚠️ Error processing pair: %s", e)
                 continue
         
-        # Convert to list and calculate popularity scores
-        currencies = []
-        for curr_id, stats in currency_stats.items():
-            if stats['pair_count'] > 0:  # Only include currencies with actual trading pairs
-                popularity_score = min(100, (stats['volume'] / 100) + (stats['pair_count'] * 2))
-                currencies.append({
-                    'id': curr_id,
-                    'name': stats['name'],
-                    'popularity_score': round(popularity_score, 2),
-                    'volume': int(stats['volume']),
-                    'pair_count': stats['pair_count'],
-                    'total_traded': round(stats['total_traded'], 4),
-                    'icon_url': stats['icon_url'],
-                    'supported': True
-                })
-        
-        # Sort by popularity and take top percentage
-        currencies.sort(key=lambda x: x['popularity_score'], reverse=True)
-        num_to_take = max(3, int(len(currencies) * top_percentage))
-        top_currencies = currencies[:num_to_take]
-        
-        print(f"✅ Extracted {len(top_currencies)} top currencies (top {top_percentage*100:.0f}%) from {len(currencies)} total")
+        # Score currencies with actual trading pairs, then keep only the top
+        # percentage before building any response dicts
+        traded = [stats for stats in currency_stats.values() if stats['pair_count'] > 0]
+        for stats in traded:
+            stats['popularity_score'] = round(min(100, (stats['volume'] / 100) + (stats['pair_count'] * 2)), 2)
+        
+        num_to_take = max(3, int(len(traded) * top_percentage))
+        top_stats = heapq.nlargest(num_to_take, traded, key=_POPULARITY_SCORE)
+        
+        top_currencies = [
+            {
+                'id': stats['id'],
+                'name': stats['name'],
+                'popularity_score': stats['popularity_score'],
+                'volume': int(stats['volume']),
+                'pair_count': stats['pair_count'],
+                'total_traded': round(stats['total_traded'], 4),
+                'icon_url': stats['icon_url'],
+                'supported': True
+            }
+            for stats in top_stats
+        ]
+        
+        logger.debug(f"✅ Extracted {len(top_currencies)} top currencies (top {top_percentage*100:.0f}%) from {len(traded)} total")
         return top_currencies
     
-    def handle_arbitrage_endpoint(self, league, query_params):
+    @staticmethod
+    def _ingest_currency(currency_stats, currency, currency_data):
+        """Accumulate one side of a trading pair into the per-currency stats"""
+        api_id = currency.get('apiId')
+        if not api_id:
+            return
+        
+        stats = currency_stats.get(api_id)
+        if stats is None:
+            stats = currency_stats[api_id] = {
+                'name': currency.get('text', api_id),
+                'id': api_id,
+                'volume': 0.0,
+                'pair_count': 0,
+                'icon_url': currency.get('iconUrl', ''),
+                'total_traded': 0.0
+            }
+        
+        stats['volume'] += currency_data.get('VolumeTraded') or 0
+        stats['total_traded'] += currency_data.get('ValueTraded') or 0
+        stats['pair_count'] += 1
+    
+    async def handle_arbitrage_endpoint(self, league, query_params):
         """Handle /api/arbitrage/{league} endpoint"""
         if HTTPX_AVAILABLE:
             try:
-                # Use async handler for live arbitrage calculations
-                return self.run_async_handler(self._fetch_live_arbitrage, league, query_params)
+                return await self._fetch_live_arbitrage(league, query_params)
             except Exception as e:
-                print(f"⚠️ Live arbitrage failed: {e}")
+                logger.warning(f"⚠️ Live arbitrage failed: {e}")
         
         # Fallback arbitrage calculation
-        starting_currency = query_params.get('starting_currency', ['chaos'])[0]
-        amount = float(query_params.get('amount', ['100'])[0])
-        min_profit = float(query_params.get('min_profit', ['0.01'])[0])
-        max_results = int(query_params.get('max_results', ['10'])[0])
+        starting_currency = query_params.get('starting_currency', 'chaos')
+        amount = float(query_params.get('amount', '100'))
+        min_profit = float(query_params.get('min_profit', '0.01'))
+        max_results = int(query_params.get('max_results', '10'))
         
         # Mock arbitrage opportunities based on realistic PoE2 rates
         opportunities = []
@@ -252,11 +319,7 @@ class handler(BaseHTTPRequestHandler):
             "total_found": len(limited_opportunities),
             "starting_currency": starting_currency,
             "league": league,
-            "summary": {
-                "best_profit_percentage": max([opp['profit_percentage'] for opp in limited_opportunities], default=0),
-                "average_profit_percentage": sum([opp['profit_percentage'] for opp in limited_opportunities]) / len(limited_opportunities) if limited_opportunities else 0,
-                "total_opportunities": len(limited_opportunities)
-            },
+            "summary": self._summarize_opportunities(limited_opportunities),
             "data_source": {
                 "source": "fallback", 
                 "fetched_at": self.get_current_time(),
@@ -267,37 +330,33 @@ class handler(BaseHTTPRequestHandler):
     
     async def _fetch_live_arbitrage(self, league, query_params):
         """Fetch live arbitrage data from poe2scout.com API"""
-        starting_currency = query_params.get('starting_currency', ['chaos'])[0]
-        amount = float(query_params.get('amount', ['100'])[0])
-        min_profit = float(query_params.get('min_profit', ['0.01'])[0])
-        max_results = int(query_params.get('max_results', ['10'])[0])
+        starting_currency = query_params.get('starting_currency', 'chaos')
+        amount = float(query_params.get('amount', '100'))
+        min_profit = float(query_params.get('min_profit', '0.01'))
+        max_results = int(query_params.get('max_results', '10'))
         
-        print(f"🌐 Fetching LIVE arbitrage data from poe2scout.com API for {starting_currency}")
+        logger.debug(f"🌐 Fetching LIVE arbitrage data from poe2scout.com API for {starting_currency}")
         
         # Fetch live currency pairs from poe2scout API
         currency_pairs = await self._fetch_poe2scout_api(league)
         
         if currency_pairs:
-            # Extract exchange rates from API currency pairs
-            exchange_rates = self._extract_exchange_rates_from_pairs(currency_pairs)
+            # Rate matrix for this snapshot, rebuilt only when the pairs change
+            index, matrix, currency_names = self._get_rate_matrix(league, currency_pairs)
             
             # Calculate arbitrage opportunities using the live rates
             opportunities = self._calculate_arbitrage_opportunities(
-                exchange_rates, starting_currency, amount, min_profit, max_results
+                index, matrix, currency_names, starting_currency, amount, min_profit, max_results
             )
             
-            print(f"✅ Found {len(opportunities)} arbitrage opportunities using LIVE API data")
+            logger.debug(f"✅ Found {len(opportunities)} arbitrage opportunities using LIVE API data")
             
             return {
                 "opportunities": opportunities,
                 "total_found": len(opportunities),
                 "starting_currency": starting_currency,
                 "league": league,
-                "summary": {
-                    "best_profit_percentage": max([opp['profit_percentage'] for opp in opportunities], default=0),
-                    "average_profit_percentage": sum([opp['profit_percentage'] for opp in opportunities]) / len(opportunities) if opportunities else 0,
-                    "total_opportunities": len(opportunities)
-                },
+                "summary": self._summarize_opportunities(opportunities),
                 "data_source": {
                     "source": "poe2scout",
                     "fetched_at": self.get_current_time(),
@@ -307,14 +366,49 @@ class handler(BaseHTTPRequestHandler):
         else:
             raise Exception("Failed to fetch live arbitrage data from poe2scout.com")
     
+    @staticmethod
+    def _summarize_opportunities(opportunities):
+        """Best and average profit percentage in a single pass"""
+        best = None
+        total = 0
+        for profit_percentage in map(_PROFIT_PERCENTAGE, opportunities):
+            total += profit_percentage
+            if best is None or profit_percentage > best:
+                best = profit_percentage
+        
+        return {
+            "best_profit_percentage": best if best is not None else 0,
+            "average_profit_percentage": total / len(opportunities) if opportunities else 0,
+            "total_opportunities": len(opportunities)
+        }
+    
+    def _get_rate_matrix(self, league, currency_pairs):
+        """Return (index, matrix, currency_names) for a league's cached pairs"""
+        cached = _RATES_CACHE.get(league)
+        if cached and cached[0] is currency_pairs:
+            return cached[1]
+        
+        exchange_rates, currency_names = self._extract_exchange_rates_from_pairs(currency_pairs)
+        index, matrix = self._build_rate_matrix(exchange_rates)
+        # Only cache matrices for pairs _PAIRS_CACHE still holds, so eviction there covers both
+        cached_pairs = _PAIRS_CACHE.get(league)
+        if cached_pairs and cached_pairs[1] is currency_pairs:
+            _RATES_CACHE[league] = (currency_pairs, (index, matrix, currency_names))
+        return index, matrix, currency_names
+    
     def _extract_exchange_rates_from_pairs(self, currency_pairs):
-        """Extract exchange rates from live poe2scout API currency pairs"""
+        """
+        Extract exchange rates from live poe2scout API currency pairs.
+        
+        Returns (rates, currency_names) where rates is {from_id: {to_id: rate}}
+        and currency_names maps API ids to display names.
+        """
         from collections import defaultdict
         
         rates = defaultdict(dict)
         currency_mapping = {}  # Map API IDs to clean names
         
-        print(f"🔍 Extracting exchange rates from {len(currency_pairs)} live currency pairs")
+        logger.debug(f"🔍 Extracting exchange rates from {len(currency_pairs)} live currency pairs")
         
         # Process currency pairs to build rate matrix
         for pair in currency_pairs:
@@ -333,8 +427,8 @@ class handler(BaseHTTPRequestHandler):
                     currency_mapping[id2] = curr_two.get('text', id2)
                     
                     # Extract rates - RelativePrice shows how much of currency two you get for one of currency one
-                    price_one_to_two = float(curr_one_data.get('RelativePrice', 0))
-                    price_two_to_one = float(curr_two_data.get('RelativePrice', 0))
+                    price_one_to_two = curr_one_data.get('RelativePrice') or 0
+                    price_two_to_one = curr_two_data.get('RelativePrice') or 0
                     
                     if price_one_to_two > 0:
                         rates[id1][id2] = price_one_to_two
@@ -342,64 +436,147 @@ class handler(BaseHTTPRequestHandler):
                         rates[id2][id1] = price_two_to_one
                         
             except Exception as e:
-                print(f"⚠️ Error processing exchange rate pair: {e}")
+                logger.debug("⚠️ Error processing exchange rate pair: %s", e)
                 continue
         
         # Convert to regular dict for consistency
         rates_dict = dict(rates)
-        print(f"✅ Extracted exchange rates for {len(rates_dict)} currencies with live API data")
-        return rates_dict
+        logger.debug(f"✅ Extracted exchange rates for {len(rates_dict)} currencies with live API data")
+        return rates_dict, currency_mapping
     
-    def _calculate_arbitrage_opportunities(self, rates, starting_currency, amount, min_profit, max_results):
-        """Calculate arbitrage opportunities from exchange rates"""
+    def _build_rate_matrix(self, rates):
+        """
+        Build a dense rate matrix from {from_id: {to_id: rate}}.
+        
+        Returns (index, matrix) where index maps currency id to row/column and
+        matrix[i, j] is the direct rate i -> j, or 0.0 when no pair is quoted.
+        """
+        ids = sorted(set(rates).union(*rates.values()))
+        index = {currency: i for i, currency in enumerate(ids)}
+        matrix = np.zeros((len(ids), len(ids)))
+        for from_id, to_rates in rates.items():
+            row = matrix[index[from_id]]
+            for to_id, rate in to_rates.items():
+                row[index[to_id]] = rate
+        return index, matrix
+    
+    def _calculate_arbitrage_opportunities(self, index, matrix, currency_names, starting_currency, amount, min_profit, max_results):
+        """
+        Find every triangular path start -> B -> C -> start that clears min_profit.
+        
+        All (B, C) combinations are evaluated at once on the rate matrix; only the
+        best max_results paths are turned into response dicts.
+        """
+        start = index.get(starting_currency)
+        if start is None or max_results <= 0:
+            return []
+        
+        # multiplier[b, c] = rate(start -> b) * rate(b -> c) * rate(c -> start)
+        multiplier = matrix[start, :, None] * matrix * matrix[None, :, start]
+        multiplier[start, :] = 0.0
+        multiplier[:, start] = 0.0
+        np.fill_diagonal(multiplier, 0.0)
+        
+        flat = multiplier.ravel()
+        candidates = np.flatnonzero(flat >= 1.0 + min_profit)
+        if len(candidates) > max_results:
+            candidates = candidates[np.argpartition(-flat[candidates], max_results - 1)[:max_results]]
+        candidates = candidates[np.argsort(-flat[candidates], kind='stable')]
+        
+        ids = list(index)
+        size = len(ids)
+        start_name = currency_names.get(starting_currency, starting_currency)
         opportunities = []
         
-        # Simple arbitrage calculation - this is a basic implementation
-        # In production, you'd want the full arbitrage algorithm
-        if starting_currency == 'chaos' and 'chaos' in rates:
-            chaos_rates = rates['chaos']
+        for flat_index in candidates.tolist():
+            b, c = divmod(flat_index, size)
+            b_id, c_id = ids[b], ids[c]
+            b_name = currency_names.get(b_id, b_id)
+            c_name = currency_names.get(c_id, c_id)
             
-            # Example opportunity: Chaos → Exalted → Divine → Chaos
-            if 'exalted' in chaos_rates and 'exalted' in rates and 'divine' in rates['exalted'] and 'divine' in rates and 'chaos' in rates['divine']:
-                step1_amount = amount * chaos_rates['exalted']  # Chaos to Exalted
-                step2_amount = step1_amount * rates['exalted']['divine']  # Exalted to Divine
-                final_amount = step2_amount * rates['divine']['chaos']  # Divine back to Chaos
-                
-                profit = final_amount - amount
-                profit_pct = (profit / amount) * 100 if amount > 0 else 0
-                
-                if profit_pct >= min_profit * 100:
-                    opportunities.append({
-                        "path_description": "Chaos Orb → Exalted Orb → Divine Orb → Chaos Orb",
-                        "profit_percentage": profit_pct,
-                        "profit_amount": profit,
-                        "final_amount": final_amount,
-                        "starting_amount": amount,
-                        "steps": [
-                            {"from_name": "Chaos Orb", "to_name": "Exalted Orb", "rate": chaos_rates['exalted'], "amount_before": amount, "amount_after": step1_amount},
-                            {"from_name": "Exalted Orb", "to_name": "Divine Orb", "rate": rates['exalted']['divine'], "amount_before": step1_amount, "amount_after": step2_amount},
-                            {"from_name": "Divine Orb", "to_name": "Chaos Orb", "rate": rates['divine']['chaos'], "amount_before": step2_amount, "amount_after": final_amount}
-                        ]
-                    })
-        
-        return opportunities[:max_results]
+            rate_1 = float(matrix[start, b])
+            rate_2 = float(matrix[b, c])
+            rate_3 = float(matrix[c, start])
+            step1_amount = amount * rate_1
+            step2_amount = step1_amount * rate_2
+            final_amount = step2_amount * rate_3
+            
+            profit = final_amount - amount
+            profit_pct = (profit / amount) * 100 if amount > 0 else 0
+            
+            opportunities.append({
+                "path_description": f"{start_name} → {b_name} → {c_name} → {start_name}",
+                "profit_percentage": profit_pct,
+                "profit_amount": profit,
+                "final_amount": final_amount,
+                "starting_amount": amount,
+                "steps": [
+                    {"from_name": start_name, "to_name": b_name, "rate": rate_1, "amount_before": amount, "amount_after": step1_amount},
+                    {"from_name": b_name, "to_name": c_name, "rate": rate_2, "amount_before": step1_amount, "amount_after": step2_amount},
+                    {"from_name": c_name, "to_name": start_name, "rate": rate_3, "amount_before": step2_amount, "amount_after": final_amount}
+                ]
+            })
+        
+        return opportunities
+    
+    def get_current_time(self):
+        """Get current time in ISO format, reformatted once per second"""
+        second = int(time.time())
+        cached = _TS_CACHE
+        if cached[0] == second:
+            return cached[1]
+        
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(second))
+        _TS_CACHE[0] = second
+        _TS_CACHE[1] = timestamp
+        return timestamp
+
+# Shared by the stdlib handler below and the FastAPI app in index.py
+live_api = PoE2ScoutLiveAPI()
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # Parse path and query parameters
+        parsed_path = urllib.parse.urlparse(self.path)
+        path = parsed_path.path
+        query_params = dict(urllib.parse.parse_qsl(parsed_path.query))
+        
+        # Route handlers
+        if path == '/api/health':
+            response = {"status": "healthy", "source": "fallback"}
+        elif path == '/api/currencies':
+            response = self.run_async_handler(live_api.handle_currencies_endpoint, query_params)
+        elif path.startswith('/api/arbitrage/'):
+            # Extract league from path like /api/arbitrage/Rise%20of%20the%20Abyssal
+            league = urllib.parse.unquote(path.split('/api/arbitrage/')[-1])
+            response = self.run_async_handler(live_api.handle_arbitrage_endpoint, league, query_params)
+        else:
+            response = {"message": "PoE2 Arbitrage Calculator API", "path": self.path, "available_endpoints": ["/api/health", "/api/currencies", "/api/arbitrage/{league}"]}
+        
+        # Serialize first so the body can be framed with Content-Length
+        body = _dumps(response)
+        
+        # Set CORS headers
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
+        self.wfile.write(body)
     
     def run_async_handler(self, coro_func, *args):
         """Run an async function in the synchronous context"""
         try:
-            # Create new event loop for this request
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Hand the coroutine to the shared background loop and wait for it
+            future = run_on_loop(coro_func(*args))
             try:
-                result = loop.run_until_complete(coro_func(*args))
-                return result
-            finally:
-                loop.close()
+                return future.result(timeout=ASYNC_HANDLER_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                # Stop the coroutine too, or it keeps running on the shared loop
+                future.cancel()
+                raise
         except Exception as e:
-            print(f"Async handler error: {e}")
+            logger.error(f"Async handler error: {e}")
             raise
-    
-    def get_current_time(self):
-        """Get current time in ISO format"""
-        import time
-        return time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
@@ -3,19 +3,56 @@ Vercel serverless function entry point for PoE2 Arbitrage Calculator
 Simplified version with inline FastAPI app
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import asyncio
 import json
-import urllib.request
+import httpx
 from typing import Dict, List
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    from .hello import live_api, run_on_loop
+except ImportError:
+    from hello import live_api, run_on_loop
+
 # GitHub raw content URLs
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com/fantasy-cc/exalted/main/api/data"
 CURRENCIES_URL = f"{GITHUB_RAW_BASE}/currencies.json"
 RATES_URL = f"{GITHUB_RAW_BASE}/rates.json"
 
+# One keep-alive client for raw.githubusercontent.com, plus the last
+# currencies payload and its ETag so unchanged data comes back as a 304.
+# The client's connections are bound to the loop that created it, so it is
+# made on the serving loop (see _github_client) and closed on shutdown.
+_GITHUB_CLIENT = {'client': None, 'loop': None}
+_GITHUB_CACHE = {'etag': None, 'data': None}
+
+def _github_client():
+    """Return the GitHub client for the running loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    if _GITHUB_CLIENT['loop'] is not loop:
+        _GITHUB_CLIENT['client'] = httpx.AsyncClient(timeout=5.0)
+        _GITHUB_CLIENT['loop'] = loop
+    return _GITHUB_CLIENT['client']
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the GitHub client on shutdown"""
+    yield
+    client = _GITHUB_CLIENT['client']
+    if client is not None and _GITHUB_CLIENT['loop'] is asyncio.get_running_loop():
+        await client.aclose()
+    _GITHUB_CLIENT['client'] = _GITHUB_CLIENT['loop'] = None
+
 # Create FastAPI app
-app = FastAPI(title="PoE2 Arbitrage API", version="2.0.0")
+app = FastAPI(title="PoE2 Arbitrage API", version="2.0.0", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -26,11 +63,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def load_currencies_from_github():
-    """Load currencies from GitHub"""
+async def load_currencies_from_github():
+    """Load currencies from GitHub, revalidating the last copy by ETag"""
     try:
-        with urllib.request.urlopen(CURRENCIES_URL, timeout=5) as response:
-            return json.loads(response.read().decode('utf-8'))
+        etag = _GITHUB_CACHE['etag']
+        headers = {'If-None-Match': etag} if etag else {}
+        response = await _github_client().get(CURRENCIES_URL, headers=headers)
+        if response.status_code == 304:
+            return _GITHUB_CACHE['data']
+        response.raise_for_status()
+        
+        data = _loads(response.content)
+        _GITHUB_CACHE['data'] = data
+        _GITHUB_CACHE['etag'] = response.headers.get('ETag')
+        return data
     except Exception as e:
         # Fallback data
         return {
@@ -50,7 +96,7 @@ async def root():
 
 @app.get("/api/health")
 async def health():
-    data = load_currencies_from_github()
+    data = await load_currencies_from_github()
     return {
         "status": "healthy",
         "currencies_count": data.get('total', 0),
@@ -60,7 +106,7 @@ async def health():
 
 @app.get("/api/currencies")
 async def get_currencies():
-    data = load_currencies_from_github()
+    data = await load_currencies_from_github()
     return {
         "currencies": data.get('currencies', []),
         "total": data.get('total', 0),
@@ -69,5 +115,13 @@ async def get_currencies():
         "fetched_at": data.get('fetched_at', 'unknown')
     }
 
+@app.get("/api/arbitrage/{league}")
+async def get_arbitrage(league: str, request: Request):
+    # live_api's HTTP client and caches belong to hello's background loop, so
+    # the handler runs there; awaiting the wrapped future keeps this loop free
+    query_params = dict(request.query_params)
+    future = run_on_loop(live_api.handle_arbitrage_endpoint(league, query_params))
+    return await asyncio.wrap_future(future)
+
 # Vercel handler
 handler = app
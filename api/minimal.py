@@ -1,7 +1,16 @@
 """
 Minimal Vercel API for PoE2 Arbitrage Calculator
 """
+import array
 import json
+from operator import itemgetter
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
 
 # Fallback currency data
 CURRENCIES = [
@@ -23,6 +32,76 @@ RATES = {
     'ancient': {'chaos': 1.25, 'exalted': 0.335, 'divine': 0.0378, 'fusing': 0.625, 'jeweller': 2.5},
 }
 
+# Flat row-major rate matrix over RATES: _RATES_FLAT[a * N + b] is the rate
+# a -> b, or 0.0 when there is no quote
+_CURRENCY_IDS = list(RATES)
+_IDX = {currency: i for i, currency in enumerate(_CURRENCY_IDS)}
+N = len(_CURRENCY_IDS)
+_RATES_FLAT = array.array('d', [RATES[a].get(b, 0.0) for a in _CURRENCY_IDS for b in _CURRENCY_IDS])
+
+def find_triangles(starting_currency, amount, min_profit_percent=1.0):
+    """Triangular paths start -> B -> C -> start, best first"""
+    opportunities = []
+    start_i = _IDX.get(starting_currency)
+    if start_i is None:
+        return opportunities
+    
+    rates = _RATES_FLAT
+    start_row = start_i * N
+    for bi in range(N):
+        rate_a_to_b = rates[start_row + bi]
+        if bi == start_i or rate_a_to_b == 0.0:
+            continue
+        amount_b = amount * rate_a_to_b
+        b_row = bi * N
+        
+        for ci in range(N):
+            rate_b_to_c = rates[b_row + ci]
+            rate_c_to_a = rates[ci * N + start_i]
+            if ci == bi or ci == start_i or rate_b_to_c == 0.0 or rate_c_to_a == 0.0:
+                continue
+            final_amount = amount_b * rate_b_to_c * rate_c_to_a
+            
+            profit = final_amount - amount
+            profit_percent = (profit / amount) * 100
+            
+            if profit_percent >= min_profit_percent:
+                opportunities.append({
+                    "path": f"{starting_currency} → {_CURRENCY_IDS[bi]} → {_CURRENCY_IDS[ci]} → {starting_currency}",
+                    "profit_percent": round(profit_percent, 2),
+                    "profit_amount": round(profit, 2),
+                    "final_amount": round(final_amount, 2)
+                })
+    
+    # Sort by profit percentage
+    opportunities.sort(key=itemgetter("profit_percent"), reverse=True)
+    return opportunities
+
+# The fallback data never changes, so these bodies are serialized once at
+# import; the league is spliced into the rates body per request
+_HEALTH_BODY = _dumps({"status": "healthy", "source": "fallback"})
+_CURRENCIES_BODY = _dumps({
+    "currencies": CURRENCIES,
+    "total": len(CURRENCIES),
+    "source": "fallback"
+})
+_RATES_BODY_TEMPLATE = _dumps({
+    "rates": RATES,
+    "league": "__LEAGUE__",
+    "source": "fallback"
+})
+_NOT_FOUND_BODY = _dumps({"error": "Not found"})
+
+# The arbitrage fallback always starts from 100 chaos
+_ARBITRAGE_OPPORTUNITIES = find_triangles("chaos", 100)
+_ARBITRAGE_BODY = _dumps({
+    "opportunities": _ARBITRAGE_OPPORTUNITIES[:10],
+    "total_found": len(_ARBITRAGE_OPPORTUNITIES),
+    "starting_currency": "chaos",
+    "amount": 100,
+    "source": "fallback"
+})
+
 def handler(request, response):
     """Vercel handler function"""
     
@@ -40,80 +119,25 @@ def handler(request, response):
     if path == '/api/health':
         response.status_code = 200
         response.headers['Content-Type'] = 'application/json'
-        return json.dumps({"status": "healthy", "source": "fallback"})
+        return _HEALTH_BODY
     
     elif path == '/api/currencies':
         response.status_code = 200
         response.headers['Content-Type'] = 'application/json'
-        return json.dumps({
-            "currencies": CURRENCIES,
-            "total": len(CURRENCIES),
-            "source": "fallback"
-        })
+        return _CURRENCIES_BODY
     
     elif path.startswith('/api/rates/'):
         response.status_code = 200
         response.headers['Content-Type'] = 'application/json'
         league = path.split('/')[-1]
-        return json.dumps({
-            "rates": RATES,
-            "league": league,
-            "source": "fallback"
-        })
+        return _RATES_BODY_TEMPLATE.replace(b'"__LEAGUE__"', _dumps(league))
     
     elif path.startswith('/api/arbitrage/'):
-        # Simple arbitrage calculation
-        opportunities = []
-        starting_currency = "chaos"
-        amount = 100
-        
-        if starting_currency in RATES:
-            rates = RATES[starting_currency]
-            
-            for currency_b in rates:
-                if currency_b == starting_currency:
-                    continue
-                    
-                rate_a_to_b = rates[currency_b]
-                amount_b = amount * rate_a_to_b
-                
-                if currency_b in RATES:
-                    for currency_c in RATES[currency_b]:
-                        if currency_c == currency_b or currency_c == starting_currency:
-                            continue
-                            
-                        rate_b_to_c = RATES[currency_b][currency_c]
-                        amount_c = amount_b * rate_b_to_c
-                        
-                        if currency_c in RATES and starting_currency in RATES[currency_c]:
-                            rate_c_to_a = RATES[currency_c][starting_currency]
-                            final_amount = amount_c * rate_c_to_a
-                            
-                            profit = final_amount - amount
-                            profit_percent = (profit / amount) * 100
-                            
-                            if profit_percent >= 1.0:  # Min 1% profit
-                                opportunities.append({
-                                    "path": f"{starting_currency} → {currency_b} → {currency_c} → {starting_currency}",
-                                    "profit_percent": round(profit_percent, 2),
-                                    "profit_amount": round(profit, 2),
-                                    "final_amount": round(final_amount, 2)
-                                })
-        
-        # Sort by profit percentage
-        opportunities.sort(key=lambda x: x["profit_percent"], reverse=True)
-        
         response.status_code = 200
         response.headers['Content-Type'] = 'application/json'
-        return json.dumps({
-            "opportunities": opportunities[:10],
-            "total_found": len(opportunities),
-            "starting_currency": starting_currency,
-            "amount": amount,
-            "source": "fallback"
-        })
+        return _ARBITRAGE_BODY
     
     else:
         response.status_code = 404
         response.headers['Content-Type'] = 'application/json'
-        return json.dumps({"error": "Not found"})
+        return _NOT_FOUND_BODY
@@ -7,18 +7,25 @@ CurrencyRateMatrix from rates.py.
 
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
-from itertools import permutations
+from functools import cached_property
+import heapq
 import logging
+import numpy as np
 
 try:
     from .rates import CurrencyRateMatrix
 except ImportError:
     from rates import CurrencyRateMatrix
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class ArbitrageStep:
     """Represents one step in an arbitrage path"""
+    # Declared by hand rather than dataclass(slots=True) to keep Python 3.9 support
+    __slots__ = ('from_currency', 'to_currency', 'rate', 'amount_before', 'amount_after')
+    
     from_currency: str
     to_currency: str
     rate: float  # Exchange rate for this step
@@ -36,19 +43,20 @@ class ArbitrageOpportunity:
     profit_percentage: float
     steps: List[ArbitrageStep] = field(default_factory=list)
     
-    @property
+    @cached_property
     def path_description(self) -> str:
-        """Human-readable description of the arbitrage path"""
+        """Human-readable description of the arbitrage path, built on first use"""
+        if not self.steps:
+            return ""
         currency_names = CurrencyRateMatrix.CURRENCY_NAMES
-        path_parts = []
-        for step in self.steps:
-            if not path_parts:  # First step
-                path_parts.append(currency_names[step.from_currency])
-            path_parts.append(currency_names[step.to_currency])
-        return " → ".join(path_parts)
+        return " → ".join([
+            currency_names[self.steps[0].from_currency],
+            *(currency_names[step.to_currency] for step in self.steps)
+        ])
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
+        currency_names = CurrencyRateMatrix.CURRENCY_NAMES
         return {
             'starting_currency': self.starting_currency,
             'starting_amount': self.starting_amount,
@@ -60,8 +68,8 @@ class ArbitrageOpportunity:
                 {
                     'from_currency': step.from_currency,
                     'to_currency': step.to_currency,
-                    'from_name': CurrencyRateMatrix.CURRENCY_NAMES[step.from_currency],
-                    'to_name': CurrencyRateMatrix.CURRENCY_NAMES[step.to_currency],
+                    'from_name': currency_names[step.from_currency],
+                    'to_name': currency_names[step.to_currency],
                     'rate': round(step.rate, 6),
                     'amount_before': round(step.amount_before, 6),
                     'amount_after': round(step.amount_after, 6)
@@ -92,7 +100,7 @@ class ArbitrageFinder:
         self.max_steps = max_steps
         self.slippage_per_step = slippage_per_step
         self.max_results = max_results
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
     
     def find_opportunities(self, 
                           rate_matrix: CurrencyRateMatrix,
@@ -109,30 +117,97 @@ class ArbitrageFinder:
         Returns:
             List of ArbitrageOpportunity objects sorted by profit percentage (descending)
         """
-        if starting_currency not in rate_matrix.SUPPORTED_CURRENCIES:
+        if not rate_matrix.is_supported(starting_currency):
             raise ValueError(f"Unsupported starting currency: {starting_currency}")
         
         opportunities = []
         
-        # Generate all possible paths of the specified length
-        other_currencies = [c for c in rate_matrix.SUPPORTED_CURRENCIES if c != starting_currency]
-        
         if self.max_steps == 3:
-            # For 3-step arbitrage: Start → A → B → Start
-            for intermediate_path in permutations(other_currencies, 2):
-                path = [starting_currency] + list(intermediate_path) + [starting_currency]
-                opportunity = self._evaluate_path(rate_matrix, path, starting_amount)
-                if opportunity and opportunity.profit_percentage >= self.min_profit_percentage:
-                    opportunities.append(opportunity)
+            # For 3-step arbitrage: Start → A → B → Start, scored for every
+            # (A, B) at once; amounts multiply in the same order as
+            # _evaluate_path so the profits match it exactly
+            rates, index = rate_matrix.as_ndarray()
+            start = index[starting_currency]
+            keep = 1 - self.slippage_per_step
+            amount_a = starting_amount * (rates[start] * keep)
+            amount_b = amount_a[:, None] * (rates * keep)
+            final = amount_b * (rates[:, start] * keep)[None, :]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                profit_percentage = ((final - starting_amount) / starting_amount) * 100
+            
+            # Only paths through three distinct currencies with every rate known
+            valid = (rates[start] > 0)[:, None] & (rates > 0) & (rates[:, start] > 0)[None, :]
+            np.fill_diagonal(valid, False)
+            valid[start, :] = False
+            valid[:, start] = False
+            
+            # Rank the cells first so only the returned paths become objects
+            candidates = np.argwhere(valid & (profit_percentage >= self.min_profit_percentage)).tolist()
+            best = heapq.nlargest(self.max_results, candidates, key=lambda ab: profit_percentage.item(*ab))
+            
+            currencies = list(index)
+            for a, b in best:
+                path = [starting_currency, currencies[a], currencies[b], starting_currency]
+                opportunities.append(self._evaluate_path(rate_matrix, path, starting_amount))
         else:
-            # For other path lengths, use recursive approach (future enhancement)
-            self.logger.warning(f"Path length {self.max_steps} not yet implemented")
+            # Other path lengths: every simple cycle of up to max_steps trades
+            opportunities = self._find_simple_cycles(rate_matrix, starting_currency, starting_amount)
+        
+        # Already sorted by profit percentage (descending) and capped at max_results
+        return opportunities
+    
+    def _find_simple_cycles(self,
+                            rate_matrix: CurrencyRateMatrix,
+                            starting_currency: str,
+                            starting_amount: float) -> List[ArbitrageOpportunity]:
+        """
+        Most profitable simple cycles of 2 up to max_steps trades.
         
-        # Sort by profit percentage (descending)
-        opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
+        Walks that repeat a currency can't stand in for a cycle: a short loop
+        taken twice may out-earn a longer simple cycle and hide it. So paths
+        of distinct currencies are extended depth-first, and each one is
+        closed through every possible last currency in a single vectorized
+        step before it is extended further. That is up to V**(max_steps - 2)
+        vector ops, so keep max_steps small on large matrices.
+        """
+        if self.max_steps < 2:
+            return []
+        
+        rates, index = rate_matrix.as_ndarray()
+        currencies = list(index)
+        start = index[starting_currency]
+        
+        # Amount multiplier per trade; unknown rates become 0 so they never pay
+        traded = np.where(rates > 0, rates * (1 - self.slippage_per_step), 0.0)
+        back = traded[:, start]
+        min_final = starting_amount * (1 + self.min_profit_percentage / 100)
+        candidates = []
+        
+        def extend(path: List[int], amount: float) -> None:
+            last = path[-1]
+            
+            # Close the cycle as path -> a -> start for every new currency a
+            final = amount * traded[last] * back
+            final[path] = 0.0
+            for a in np.flatnonzero(final >= min_final).tolist():
+                candidates.append((final.item(a), path + [a, start]))
+            
+            # Room for another stop before closing
+            if len(path) + 2 > self.max_steps:
+                return
+            for a in np.flatnonzero(traded[last]).tolist():
+                if a not in path:
+                    extend(path + [a], amount * traded.item(last, a))
+        
+        extend([start], starting_amount)
         
-        # Return top results
-        return opportunities[:self.max_results]
+        # Rank first so only the returned paths become objects
+        opportunities = []
+        for _, path in heapq.nlargest(self.max_results, candidates, key=lambda c: c[0]):
+            opportunity = self._evaluate_path(rate_matrix, [currencies[i] for i in path], starting_amount)
+            if opportunity:
+                opportunities.append(opportunity)
+        return opportunities
     
     def _evaluate_path(self, 
                       rate_matrix: CurrencyRateMatrix,
@@ -152,6 +227,10 @@ class ArbitrageFinder:
         if len(path) < 2:
             return None
         
+        rates, index = rate_matrix.as_ndarray()
+        if any(currency not in index for currency in path):
+            return None  # Currency not supported
+        
         steps = []
         current_amount = starting_amount
         
@@ -161,12 +240,9 @@ class ArbitrageFinder:
             to_currency = path[i + 1]
             
             # Get the exchange rate
-            try:
-                rate = rate_matrix.get_rate(from_currency, to_currency)
-                if rate <= 0:
-                    return None  # Invalid rate, path not viable
-            except ValueError:
-                return None  # Currency not supported
+            rate = rates.item(index[from_currency], index[to_currency])
+            if rate <= 0:
+                return None  # Invalid rate, path not viable
             
             # Apply slippage if configured
             effective_rate = rate * (1 - self.slippage_per_step)
@@ -254,15 +330,16 @@ class ArbitrageFinder:
                 'total_profit_amount': 0.0
             }
         
-        profits = [op.profit_percentage for op in opportunities]
-        profit_amounts = [op.profit_amount for op in opportunities]
+        count = len(opportunities)
+        profits = np.fromiter((op.profit_percentage for op in opportunities), dtype=np.float64, count=count)
+        profit_amounts = np.fromiter((op.profit_amount for op in opportunities), dtype=np.float64, count=count)
         
         return {
-            'total_opportunities': len(opportunities),
-            'best_profit_percentage': max(profits),
-            'average_profit_percentage': sum(profits) / len(profits),
-            'total_profit_amount': sum(profit_amounts),
-            'worst_profit_percentage': min(profits)
+            'total_opportunities': count,
+            'best_profit_percentage': float(profits.max()),
+            'average_profit_percentage': float(profits.mean()),
+            'total_profit_amount': float(profit_amounts.sum()),
+            'worst_profit_percentage': float(profits.min())
         }
 
 
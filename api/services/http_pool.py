@@ -0,0 +1,52 @@
+"""
+Shared HTTP client for POE2 Scout
+
+Keeps one pooled httpx.AsyncClient per process so repeated fetches reuse
+keep-alive connections to poe2scout.com instead of paying a TCP+TLS
+handshake on every call.
+"""
+
+from typing import Optional
+import httpx
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+SCOUT_TIMEOUT = 10.0  # 10 second timeout
+SCOUT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'User-Agent': 'Mozilla/5.0 (compatible; poe2-arbitrage-backend/1.0)'
+}
+SCOUT_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+_scout_client: Optional[httpx.AsyncClient] = None
+
+
+def new_scout_client() -> httpx.AsyncClient:
+    """Build a client configured for poe2scout.com; the caller owns it"""
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(SCOUT_TIMEOUT),
+        limits=SCOUT_LIMITS,
+        headers=SCOUT_HEADERS
+    )
+
+
+def get_scout_client() -> httpx.AsyncClient:
+    """Return the process-wide client, creating it on first use"""
+    global _scout_client
+    if _scout_client is None or _scout_client.is_closed:
+        _scout_client = new_scout_client()
+    return _scout_client
+
+
+async def close_scout_client() -> None:
+    """Close the process-wide client (call on application shutdown)"""
+    global _scout_client
+    if _scout_client is not None:
+        await _scout_client.aclose()
+        _scout_client = None
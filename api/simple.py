@@ -1,10 +1,13 @@
 """
 Simple Vercel API for PoE2 Arbitrage Calculator
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import functools
 import json
+import heapq
+import numpy as np
 
 app = FastAPI(title="PoE2 Arbitrage Calculator API")
 
@@ -73,6 +76,26 @@ FALLBACK_RATES = {
     }
 }
 
+# Dense layout of FALLBACK_RATES for the arbitrage scan: RATE_MATRIX[i, j] is
+# the rate from CURRENCIES[i] to CURRENCIES[j], 0.0 where no rate is listed
+CURRENCIES = list(FALLBACK_RATES)
+CURRENCY_INDEX = {currency: i for i, currency in enumerate(CURRENCIES)}
+RATE_MATRIX = np.array(
+    [[FALLBACK_RATES[a].get(b, 0.0) for b in CURRENCIES] for a in CURRENCIES],
+    dtype=np.float64
+)
+
+# The fallback payloads never change, so serialize them once at import;
+# only the league name is spliced into the rates response per request
+_JSON_SEPARATORS = (",", ":")
+CURRENCIES_RESPONSE = json.dumps({
+    "currencies": FALLBACK_CURRENCIES,
+    "total": len(FALLBACK_CURRENCIES),
+    "source": "fallback"
+}, separators=_JSON_SEPARATORS).encode()
+RATES_RESPONSE_HEAD = b'{"rates":' + json.dumps(FALLBACK_RATES, separators=_JSON_SEPARATORS).encode() + b',"league":'
+RATES_RESPONSE_TAIL = b',"source":"fallback"}'
+
 @app.get("/")
 async def root():
     return {"message": "PoE2 Arbitrage Calculator API", "status": "running"}
@@ -84,20 +107,64 @@ async def health():
 @app.get("/api/currencies")
 async def get_currencies():
     """Get list of supported currencies"""
-    return {
-        "currencies": FALLBACK_CURRENCIES,
-        "total": len(FALLBACK_CURRENCIES),
-        "source": "fallback"
-    }
+    return Response(content=CURRENCIES_RESPONSE, media_type="application/json")
 
 @app.get("/api/rates/{league}")
 async def get_rates(league: str):
     """Get exchange rates for a league"""
-    return {
-        "rates": FALLBACK_RATES,
-        "league": league,
-        "source": "fallback"
-    }
+    content = RATES_RESPONSE_HEAD + json.dumps(league).encode() + RATES_RESPONSE_TAIL
+    return Response(content=content, media_type="application/json")
+
+@functools.lru_cache(maxsize=256)
+def _top_arbitrage(starting_currency: str, amount: float, min_profit: float) -> Tuple[List[Dict], int]:
+    """
+    Top 10 opportunities and the total count for one parameter set.
+    The fallback rates never change, so results are cached per parameters.
+    """
+    # Simple arbitrage calculation
+    opportunities = []
+    candidates = []
+    
+    start = CURRENCY_INDEX.get(starting_currency)
+    if start is not None:
+        # final[b, c]: amount after start → b → c → start, for every (b, c) at once
+        to_b = RATE_MATRIX[start]
+        back = RATE_MATRIX[:, start]
+        amount_b = amount * to_b
+        amount_c = amount_b[:, None] * RATE_MATRIX
+        final = amount_c * back[None, :]
+        profit_percent = (final - amount) / amount * 100
+        
+        # Drop paths that revisit a currency or use a missing rate
+        valid = (to_b > 0)[:, None] & (RATE_MATRIX > 0) & (back > 0)[None, :]
+        np.fill_diagonal(valid, False)
+        valid[start, :] = False
+        valid[:, start] = False
+        
+        # Rank the profitable (b, c) cells first; only the top 10 become dicts
+        candidates = np.argwhere(valid & (profit_percent >= min_profit)).tolist()
+        ranked = heapq.nlargest(10, candidates, key=lambda bc: round(profit_percent.item(*bc), 2))
+        
+        for b, c in ranked:
+            currency_b = CURRENCIES[b]
+            currency_c = CURRENCIES[c]
+            opportunities.append({
+                "path": f"{starting_currency} → {currency_b} → {currency_c} → {starting_currency}",
+                "profit_percent": round(profit_percent.item(b, c), 2),
+                "profit_amount": round(final.item(b, c) - amount, 2),
+                "final_amount": round(final.item(b, c), 2),
+                "steps": [
+                    {"from": starting_currency, "to": currency_b, "rate": to_b.item(b), "amount": round(amount_b.item(b), 2)},
+                    {"from": currency_b, "to": currency_c, "rate": RATE_MATRIX.item(b, c), "amount": round(amount_c.item(b, c), 2)},
+                    {"from": currency_c, "to": starting_currency, "rate": back.item(c), "amount": round(final.item(b, c), 2)}
+                ]
+            })
+    
+    return opportunities, len(candidates)
+
+# Warm the cache with the endpoint's default amount and min_profit
+for _currency in ("chaos", "exalted", "divine"):
+    _top_arbitrage(_currency, 100, 1.0)
 
 @app.get("/api/arbitrage/{league}")
 async def find_arbitrage(
@@ -107,54 +174,11 @@ async def find_arbitrage(
     min_profit: float = 1.0
 ):
     """Find arbitrage opportunities"""
-    
-    # Simple arbitrage calculation
-    opportunities = []
-    
-    if starting_currency in FALLBACK_RATES:
-        rates = FALLBACK_RATES[starting_currency]
-        
-        for currency_b in rates:
-            if currency_b == starting_currency:
-                continue
-                
-            rate_a_to_b = rates[currency_b]
-            amount_b = amount * rate_a_to_b
-            
-            if currency_b in FALLBACK_RATES:
-                for currency_c in FALLBACK_RATES[currency_b]:
-                    if currency_c == currency_b or currency_c == starting_currency:
-                        continue
-                        
-                    rate_b_to_c = FALLBACK_RATES[currency_b][currency_c]
-                    amount_c = amount_b * rate_b_to_c
-                    
-                    if currency_c in FALLBACK_RATES and starting_currency in FALLBACK_RATES[currency_c]:
-                        rate_c_to_a = FALLBACK_RATES[currency_c][starting_currency]
-                        final_amount = amount_c * rate_c_to_a
-                        
-                        profit = final_amount - amount
-                        profit_percent = (profit / amount) * 100
-                        
-                        if profit_percent >= min_profit:
-                            opportunities.append({
-                                "path": f"{starting_currency} → {currency_b} → {currency_c} → {starting_currency}",
-                                "profit_percent": round(profit_percent, 2),
-                                "profit_amount": round(profit, 2),
-                                "final_amount": round(final_amount, 2),
-                                "steps": [
-                                    {"from": starting_currency, "to": currency_b, "rate": rate_a_to_b, "amount": round(amount_b, 2)},
-                                    {"from": currency_b, "to": currency_c, "rate": rate_b_to_c, "amount": round(amount_c, 2)},
-                                    {"from": currency_c, "to": starting_currency, "rate": rate_c_to_a, "amount": round(final_amount, 2)}
-                                ]
-                            })
-    
-    # Sort by profit percentage
-    opportunities.sort(key=lambda x: x["profit_percent"], reverse=True)
+    opportunities, total_found = _top_arbitrage(starting_currency, amount, min_profit)
     
     return {
-        "opportunities": opportunities[:10],  # Top 10
-        "total_found": len(opportunities),
+        "opportunities": opportunities,  # Top 10
+        "total_found": total_found,
         "starting_currency": starting_currency,
         "amount": amount,
         "min_profit": min_profit,
@@ -177,12 +177,10 @@ async def get_arbitrage_opportunities(
         opportunities = find_arbitrage_opportunities(
             starting_currency=starting_currency,
             amount=amount,
-            min_profit=min_profit
+            min_profit=min_profit,
+            limit=max_results
         )
         
-        # Limit results
-        opportunities = opportunities[:max_results]
-        
         # Calculate summary stats
         if opportunities:
             best_profit = max(op['profit_percentage'] for op in opportunities)
@@ -6,11 +6,21 @@ that are populated by the GitHub Actions scraper.
 """
 
 import json
+import heapq
 import os
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from datetime import datetime, timezone
 import urllib.request
+import numpy as np
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 # GitHub raw content URLs for data files
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com/fantasy-cc/exalted/main/api/data"
@@ -21,6 +31,46 @@ RATES_URL = f"{GITHUB_RAW_BASE}/rates.json"
 API_DIR = Path(__file__).parent
 DATA_DIR = API_DIR / 'data'
 
+# The scraper publishes new data every 5 minutes, so a parsed GitHub payload
+# is reused for a minute instead of being refetched on every call
+GITHUB_CACHE_TTL = 60.0
+_github_cache: Dict[str, tuple] = {}  # url -> (fetched_at monotonic, data)
+_file_cache: Dict[Path, tuple] = {}  # path -> (st_mtime_ns, data)
+_flat_rates_cache: tuple = (None, MappingProxyType({}))  # (rates dict, flattened view)
+
+
+def _fetch_github_json(url: str) -> Dict:
+    """Fetch and parse a JSON file from GitHub, reusing it for GITHUB_CACHE_TTL seconds"""
+    cached = _github_cache.get(url)
+    if cached and time.monotonic() - cached[0] < GITHUB_CACHE_TTL:
+        # A recent failure is remembered too, so callers don't wait out the
+        # timeout again before falling back to the local file
+        if cached[1] is None:
+            raise RuntimeError("GitHub fetch failed recently")
+        return cached[1]
+    
+    print(f"DEBUG: Fetching from GitHub: {url}")
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            data = _loads(response.read())
+    except Exception:
+        _github_cache[url] = (time.monotonic(), None)
+        raise
+    _github_cache[url] = (time.monotonic(), data)
+    return data
+
+
+def _read_json_file(path: Path) -> Dict:
+    """Parse a local JSON file, re-reading it only when its mtime changes"""
+    mtime = path.stat().st_mtime_ns
+    cached = _file_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    data = _loads(path.read_bytes())
+    _file_cache[path] = (mtime, data)
+    return data
+
 
 def load_currencies() -> Dict:
     """
@@ -32,24 +82,16 @@ def load_currencies() -> Dict:
     """
     # Try fetching from GitHub first
     try:
-        print(f"DEBUG: Fetching from GitHub: {CURRENCIES_URL}")
-        with urllib.request.urlopen(CURRENCIES_URL, timeout=5) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            print(f"DEBUG: Successfully loaded {data.get('total', 0)} currencies from GitHub")
-            return data
+        return _fetch_github_json(CURRENCIES_URL)
     except Exception as e:
         print(f"DEBUG: GitHub fetch failed: {e}")
     
     # Try local file as fallback
     currencies_file = DATA_DIR / 'currencies.json'
-    print(f"DEBUG: Trying local file: {currencies_file}")
     
     if currencies_file.exists():
         try:
-            with open(currencies_file, 'r') as f:
-                data = json.load(f)
-                print(f"DEBUG: Loaded from local file")
-                return data
+            return _read_json_file(currencies_file)
         except Exception as e:
             print(f"DEBUG: Local file error: {e}")
     
@@ -78,24 +120,16 @@ def load_rates() -> Dict:
     """
     # Try fetching from GitHub first
     try:
-        print(f"DEBUG: Fetching rates from GitHub: {RATES_URL}")
-        with urllib.request.urlopen(RATES_URL, timeout=5) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            print(f"DEBUG: Successfully loaded rates from GitHub")
-            return data
+        return _fetch_github_json(RATES_URL)
     except Exception as e:
         print(f"DEBUG: GitHub rates fetch failed: {e}")
     
     # Try local file as fallback
     rates_file = DATA_DIR / 'rates.json'
-    print(f"DEBUG: Trying local rates file: {rates_file}")
     
     if rates_file.exists():
         try:
-            with open(rates_file, 'r') as f:
-                data = json.load(f)
-                print(f"DEBUG: Loaded rates from local file")
-                return data
+            return _read_json_file(rates_file)
         except Exception as e:
             print(f"DEBUG: Local rates file error: {e}")
     
@@ -129,18 +163,51 @@ def get_exchange_rate(from_currency: str, to_currency: str) -> float:
         Exchange rate, or 0 if not found
     """
     rates_data = load_rates()
-    rates = rates_data.get('rates', {})
+    return _flat_rates(rates_data.get('rates', {})).get((from_currency, to_currency), 0)
+
+
+def _flat_rates(rates: Dict) -> Mapping[Tuple[str, str], float]:
+    """
+    Read-only (from, to) -> rate view of a rates dict, built once per loaded snapshot
+    
+    Pairs missing a direct rate get the inverse of the reverse rate (0 if that is 0).
+    """
+    global _flat_rates_cache
+    if _flat_rates_cache[0] is rates:
+        return _flat_rates_cache[1]
     
-    # Direct rate
-    if from_currency in rates and to_currency in rates[from_currency]:
-        return rates[from_currency][to_currency]
+    flat = {}
+    for from_currency, row in rates.items():
+        for to_currency, rate in row.items():
+            flat[(from_currency, to_currency)] = rate
+    # Inverse rates only fill gaps, direct rates always win
+    for (from_currency, to_currency), rate in list(flat.items()):
+        if (to_currency, from_currency) not in flat:
+            flat[(to_currency, from_currency)] = 1.0 / rate if rate > 0 else 0
     
-    # Inverse rate
-    if to_currency in rates and from_currency in rates[to_currency]:
-        inverse_rate = rates[to_currency][from_currency]
-        return 1.0 / inverse_rate if inverse_rate > 0 else 0
+    _flat_rates_cache = (rates, MappingProxyType(flat))
+    return _flat_rates_cache[1]
+
+
+def _rate_matrix(rates: Dict, currencies: List[str]) -> np.ndarray:
+    """Rates between every pair of currencies, inverse-filled the same way as _flat_rates"""
+    index = {currency: i for i, currency in enumerate(currencies)}
+    n = len(currencies)
+    direct = np.zeros((n, n), dtype=np.float64)
+    known = np.zeros((n, n), dtype=bool)
+    for from_currency, row in rates.items():
+        i = index.get(from_currency)
+        if i is None:
+            continue
+        for to_currency, rate in row.items():
+            j = index.get(to_currency)
+            if j is not None:
+                direct[i, j] = rate
+                known[i, j] = True
     
-    return 0
+    with np.errstate(divide='ignore'):
+        inverse = np.where(direct.T > 0, 1.0 / direct.T, 0.0)
+    return np.where(known, direct, np.where(known.T, inverse, 0.0))
 
 
 def convert_currency(amount: float, from_currency: str, to_currency: str) -> float:
@@ -165,7 +232,8 @@ def convert_currency(amount: float, from_currency: str, to_currency: str) -> flo
 def find_arbitrage_opportunities(
     starting_currency: str,
     amount: float = 100.0,
-    min_profit: float = 0.01
+    min_profit: float = 0.01,
+    limit: Optional[int] = None
 ) -> List[Dict]:
     """
     Find 3-step arbitrage opportunities
@@ -174,6 +242,7 @@ def find_arbitrage_opportunities(
         starting_currency: Currency to start with
         amount: Amount to start with
         min_profit: Minimum profit percentage (0.01 = 1%)
+        limit: Only return the most profitable `limit` opportunities
         
     Returns:
         List of arbitrage opportunities
@@ -183,80 +252,84 @@ def find_arbitrage_opportunities(
     
     currencies = [c['id'] for c in currencies_data.get('currencies', [])]
     rates = rates_data.get('rates', {})
+    currency_names = {c['id']: c['name'] for c in currencies_data.get('currencies', [])}
     
     opportunities = []
+    if not currencies:
+        return opportunities
     
-    # Try all 3-step paths: A → B → C → A
-    for currency_b in currencies:
-        if currency_b == starting_currency:
-            continue
-            
-        for currency_c in currencies:
-            if currency_c == starting_currency or currency_c == currency_b:
-                continue
-            
-            # Calculate the path
-            # Step 1: starting_currency → currency_b
-            rate_ab = get_exchange_rate(starting_currency, currency_b)
-            if rate_ab <= 0:
-                continue
-            amount_b = amount * rate_ab
-            
-            # Step 2: currency_b → currency_c
-            rate_bc = get_exchange_rate(currency_b, currency_c)
-            if rate_bc <= 0:
-                continue
-            amount_c = amount_b * rate_bc
-            
-            # Step 3: currency_c → starting_currency
-            rate_ca = get_exchange_rate(currency_c, starting_currency)
-            if rate_ca <= 0:
-                continue
-            final_amount = amount_c * rate_ca
-            
-            # Calculate profit
-            profit = final_amount - amount
-            profit_percentage = (profit / amount) if amount > 0 else 0
-            
-            # Check if profitable
-            if profit_percentage >= min_profit:
-                # Get currency names
-                currency_names = {c['id']: c['name'] for c in currencies_data.get('currencies', [])}
-                
-                opportunities.append({
-                    'path': [starting_currency, currency_b, currency_c, starting_currency],
-                    'path_description': f"{currency_names.get(starting_currency, starting_currency)} → {currency_names.get(currency_b, currency_b)} → {currency_names.get(currency_c, currency_c)} → {currency_names.get(starting_currency, starting_currency)}",
-                    'starting_amount': amount,
-                    'final_amount': round(final_amount, 4),
-                    'profit_amount': round(profit, 4),
-                    'profit_percentage': round(profit_percentage * 100, 2),
-                    'steps': [
-                        {
-                            'from': starting_currency,
-                            'to': currency_b,
-                            'rate': rate_ab,
-                            'amount_in': amount,
-                            'amount_out': round(amount_b, 4)
-                        },
-                        {
-                            'from': currency_b,
-                            'to': currency_c,
-                            'rate': rate_bc,
-                            'amount_in': round(amount_b, 4),
-                            'amount_out': round(amount_c, 4)
-                        },
-                        {
-                            'from': currency_c,
-                            'to': starting_currency,
-                            'rate': rate_ca,
-                            'amount_in': round(amount_c, 4),
-                            'amount_out': round(final_amount, 4)
-                        }
-                    ]
-                })
+    # Rates for every leg of A → B → C → A, resolved once from this snapshot
+    matrix_ids = currencies if starting_currency in currencies else currencies + [starting_currency]
+    start = matrix_ids.index(starting_currency)
+    n = len(currencies)
+    rate_matrix = _rate_matrix(rates, matrix_ids)
+    to_b = rate_matrix[start, :n]
+    back = rate_matrix[:n, start]
+    between = rate_matrix[:n, :n]
+    
+    # Amounts along every path at once; final[b, c] ends back in starting_currency
+    amount_b = amount * to_b
+    amount_c = amount_b[:, None] * between
+    final = amount_c * back[None, :]
+    if amount > 0:
+        profit_percentage = (final - amount) / amount
+    else:
+        profit_percentage = np.zeros(final.shape, dtype=np.int64)
+    
+    # Only paths through three distinct currencies with every rate known
+    ids = np.array(currencies, dtype=object)
+    distinct = (ids[:, None] != ids[None, :]) & (ids != starting_currency)[:, None] & (ids != starting_currency)[None, :]
+    valid = distinct & (to_b > 0)[:, None] & (between > 0) & (back > 0)[None, :]
     
-    # Sort by profit percentage
-    opportunities.sort(key=lambda x: x['profit_percentage'], reverse=True)
+    # Rank the profitable (b, c) cells by profit first so only the returned
+    # ones are turned into dicts; a top-N selection skips sorting the rest
+    candidates = np.argwhere(valid & (profit_percentage >= min_profit)).tolist()
+    rank_key = lambda bc: round(profit_percentage.item(*bc) * 100, 2)
+    if limit is not None:
+        ranked = heapq.nlargest(limit, candidates, key=rank_key)
+    else:
+        ranked = sorted(candidates, key=rank_key, reverse=True)
+    
+    for b, c in ranked:
+        currency_b = currencies[b]
+        currency_c = currencies[c]
+        rate_ab = to_b.item(b)
+        rate_bc = between.item(b, c)
+        rate_ca = back.item(c)
+        final_amount = final.item(b, c)
+        profit = final_amount - amount
+        
+        opportunities.append({
+            'path': [starting_currency, currency_b, currency_c, starting_currency],
+            'path_description': f"{currency_names.get(starting_currency, starting_currency)} → {currency_names.get(currency_b, currency_b)} → {currency_names.get(currency_c, currency_c)} → {currency_names.get(starting_currency, starting_currency)}",
+            'starting_amount': amount,
+            'final_amount': round(final_amount, 4),
+            'profit_amount': round(profit, 4),
+            'profit_percentage': round(profit_percentage.item(b, c) * 100, 2),
+            'steps': [
+                {
+                    'from': starting_currency,
+                    'to': currency_b,
+                    'rate': rate_ab,
+                    'amount_in': amount,
+                    'amount_out': round(amount_b.item(b), 4)
+                },
+                {
+                    'from': currency_b,
+                    'to': currency_c,
+                    'rate': rate_bc,
+                    'amount_in': round(amount_b.item(b), 4),
+                    'amount_out': round(amount_c.item(b, c), 4)
+                },
+                {
+                    'from': currency_c,
+                    'to': starting_currency,
+                    'rate': rate_ca,
+                    'amount_in': round(amount_c.item(b, c), 4),
+                    'amount_out': round(final_amount, 4)
+                }
+            ]
+        })
     
     return opportunities
 
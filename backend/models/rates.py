@@ -6,10 +6,20 @@ currency exchange rates for Path of Exile 2 arbitrage calculations.
 """
 
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+import functools
 import json
 import logging
+import time
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Words kept lowercase in generated currency display names
+_SMALL_WORDS = frozenset({'of', 'the', 'and'})
 
 
 @dataclass
@@ -20,13 +30,14 @@ class RateMetadata:
     game: str = 'poe2'
     fetched_at: datetime = None
     ttl_seconds: int = 300  # 5 minutes default
+    # Monotonic clock reading at construction; metadata is built when data is fetched
+    fetched_monotonic: float = field(default_factory=time.monotonic, repr=False, compare=False)
     
     def is_expired(self) -> bool:
         """Check if the data is expired based on TTL"""
         if not self.fetched_at:
             return True
-        elapsed = (datetime.utcnow() - self.fetched_at).total_seconds()
-        return elapsed > self.ttl_seconds
+        return time.monotonic() - self.fetched_monotonic > self.ttl_seconds
 
 
 class CurrencyRateMatrix:
@@ -34,7 +45,7 @@ class CurrencyRateMatrix:
     Represents currency exchange rates as a matrix for efficient arbitrage calculations.
     
     Key features:
-    - O(1) lookups for any currency pair
+    - O(1) lookups for any currency pair (dense NumPy matrix + index)
     - Automatic inverse rate calculation
     - Supports transitive rate computation
     - JSON serializable for API responses
@@ -42,27 +53,27 @@ class CurrencyRateMatrix:
     
     # Expanded currency support based on POE2Scout volume analysis (Sept 12, 2025)
     # Tier 1: Ultra-high volume currencies (core trading pairs)
-    CORE_CURRENCIES = [
-        'exalted', 'divine', 'chaos'
-    ]
+    CORE_CURRENCIES = (
+        'exalted', 'divine', 'chaos',
+    )
     
     # Tier 2: High volume popular currencies 
-    POPULAR_CURRENCIES = [
+    POPULAR_CURRENCIES = (
         'mirror', 'perfect_exalted', 'orb_annulment', 'orb_chance', 'perfect_chaos',
         'fracturing_orb', 'greater_exalted', 'perfect_jeweller', 'uncut_gem_20'
-    ]
+    )
     
     # Tier 3: Omens (very popular in POE2)
-    OMEN_CURRENCIES = [
+    OMEN_CURRENCIES = (
         'omen_light', 'omen_homogenising', 'omen_abyssal', 'omen_whittling', 
         'omen_chaotic', 'omen_amelioration', 'omen_chance', 'omen_corruption'
-    ]
+    )
     
     # Tier 4: Runes & Special Items
-    SPECIAL_CURRENCIES = [
+    SPECIAL_CURRENCIES = (
         'rakiata_flow', 'talisman_sirrius', 'hinekora_lock', 'farrul_rune',
         'atalui_bloodletting', 'dialla_desire', 'ancient_jawbone'
-    ]
+    )
     
     # All supported currencies (focus on high volume for good arbitrage liquidity)
     SUPPORTED_CURRENCIES = CORE_CURRENCIES + POPULAR_CURRENCIES + OMEN_CURRENCIES[:6] + SPECIAL_CURRENCIES[:5]
@@ -102,15 +113,16 @@ class CurrencyRateMatrix:
     
     def __init__(self, metadata: RateMetadata, supported_currencies: List[str] = None):
         self.metadata = metadata
-        self._rates: Dict[str, Dict[str, float]] = {}
-        self.logger = logging.getLogger(__name__)
+        self._index: Dict[str, int] = {}
+        self._matrix: np.ndarray = None
+        self._rates_cache: Optional[Dict[str, Dict[str, float]]] = None
         
         # Use dynamic currencies if provided, otherwise fallback to hardcoded list
         if supported_currencies:
             self.SUPPORTED_CURRENCIES = supported_currencies
             # Build dynamic currency names mapping
             self.CURRENCY_NAMES = self._build_dynamic_currency_names(supported_currencies)
-            self.logger.info(f"🔄 Using dynamic currency support: {len(supported_currencies)} currencies")
+            logger.info(f"🔄 Using dynamic currency support: {len(supported_currencies)} currencies")
         else:
             # Use the original hardcoded currencies
             pass  # Keep existing SUPPORTED_CURRENCIES and CURRENCY_NAMES
@@ -132,24 +144,25 @@ class CurrencyRateMatrix:
                 # Generate a display name from the currency key
                 display_name = self._generate_display_name(currency)
                 names[currency] = display_name
-                self.logger.debug(f"Generated name: {currency} -> {display_name}")
+                logger.debug(f"Generated name: {currency} -> {display_name}")
         
         return names
     
-    def _generate_display_name(self, currency_key: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _generate_display_name(currency_key: str) -> str:
         """
         Generate a human-readable display name from a currency key.
+        Cached, since the same keys come back on every matrix rebuild.
         """
         # Convert snake_case to Title Case
         words = currency_key.split('_')
         
-        # Capitalize each word
-        capitalized = []
-        for word in words:
-            if word.lower() in ['of', 'the', 'and']:
-                capitalized.append(word.lower())
-            else:
-                capitalized.append(word.capitalize())
+        # Capitalize each word, keeping small joining words lowercase
+        capitalized = [
+            word.lower() if word.lower() in _SMALL_WORDS else word.capitalize()
+            for word in words
+        ]
         
         # Join with spaces
         display_name = ' '.join(capitalized)
@@ -164,37 +177,80 @@ class CurrencyRateMatrix:
     
     def _initialize_matrix(self):
         """Initialize the rate matrix with identity rates (currency to itself = 1.0)"""
-        for from_currency in self.SUPPORTED_CURRENCIES:
-            self._rates[from_currency] = {}
-            for to_currency in self.SUPPORTED_CURRENCIES:
-                if from_currency == to_currency:
-                    self._rates[from_currency][to_currency] = 1.0
-                else:
-                    self._rates[from_currency][to_currency] = 0.0
+        self._index = {currency: i for i, currency in enumerate(dict.fromkeys(self.SUPPORTED_CURRENCIES))}
+        size = len(self._index)
+        self._matrix = np.eye(size, dtype=np.float64)
+        self._rates_cache = None
+        self._neg_log_cache = {}
+        self._price_table_cache = {}
     
     def set_rate(self, from_currency: str, to_currency: str, rate: float) -> None:
         """
         Set exchange rate: 1 from_currency = rate to_currency
         Automatically sets the inverse rate.
         """
-        if from_currency not in self.SUPPORTED_CURRENCIES:
+        if from_currency not in self._index:
             raise ValueError(f"Unsupported currency: {from_currency}")
-        if to_currency not in self.SUPPORTED_CURRENCIES:
+        if to_currency not in self._index:
             raise ValueError(f"Unsupported currency: {to_currency}")
         if rate <= 0:
             raise ValueError(f"Rate must be positive, got: {rate}")
         
-        self._rates[from_currency][to_currency] = rate
-        self._rates[to_currency][from_currency] = 1.0 / rate
+        i, j = self._index[from_currency], self._index[to_currency]
+        self._matrix[i, j] = rate
+        self._matrix[j, i] = 1.0 / rate
+        self._rates_cache = None
+        self._neg_log_cache = {}
+        self._price_table_cache = {}
+    
+    def set_rates_bulk(self, rates: Dict[str, Dict[str, float]]) -> None:
+        """
+        Set many exchange rates at once from {from_currency: {to_currency: rate}}.
+        Same result as calling set_rate for each pair in order, but the matrix
+        is written in a single vectorized store.
+        """
+        from_idx, to_idx, values = [], [], []
+        for from_currency, to_rates in rates.items():
+            if from_currency not in self._index:
+                raise ValueError(f"Unsupported currency: {from_currency}")
+            i = self._index[from_currency]
+            for to_currency, rate in to_rates.items():
+                if to_currency not in self._index:
+                    raise ValueError(f"Unsupported currency: {to_currency}")
+                from_idx.append(i)
+                to_idx.append(self._index[to_currency])
+                values.append(rate)
+        
+        if not values:
+            return
+        values = np.array(values, dtype=np.float64)
+        if (values <= 0).any():
+            raise ValueError(f"Rate must be positive, got: {values[values <= 0][0]}")
+        
+        # Interleave each rate with its inverse so later pairs win, as with set_rate
+        rows = np.column_stack((from_idx, to_idx)).ravel()
+        cols = np.column_stack((to_idx, from_idx)).ravel()
+        self._matrix[rows, cols] = np.column_stack((values, 1.0 / values)).ravel()
+        self._rates_cache = None
+        self._neg_log_cache = {}
+        self._price_table_cache = {}
     
     def get_rate(self, from_currency: str, to_currency: str) -> float:
         """Get exchange rate: 1 from_currency = ? to_currency"""
-        if from_currency not in self.SUPPORTED_CURRENCIES:
+        if from_currency not in self._index:
             raise ValueError(f"Unsupported currency: {from_currency}")
-        if to_currency not in self.SUPPORTED_CURRENCIES:
+        if to_currency not in self._index:
             raise ValueError(f"Unsupported currency: {to_currency}")
         
-        return self._rates[from_currency][to_currency]
+        return self._matrix.item(self._index[from_currency], self._index[to_currency])
+    
+    def get_rates_to(self, to_currency: str) -> Dict[str, float]:
+        """Get every currency's rate to to_currency: {from_currency: rate}"""
+        if to_currency not in self._index:
+            raise ValueError(f"Unsupported currency: {to_currency}")
+        
+        column = self._matrix[:, self._index[to_currency]].tolist()
+        return {currency: column[i] for currency, i in self._index.items()}
     
     def convert(self, amount: float, from_currency: str, to_currency: str) -> float:
         """Convert amount from one currency to another"""
@@ -203,6 +259,47 @@ class CurrencyRateMatrix:
             raise ValueError(f"No valid rate from {from_currency} to {to_currency}")
         return amount * rate
     
+    def as_ndarray(self) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        The dense rate matrix and its {currency: row/column} index, for
+        vectorized scans. Both are the live internals, so treat them as read-only.
+        """
+        return self._matrix, self._index
+    
+    def neg_log_rates(self, slippage_per_step: float = 0.0) -> np.ndarray:
+        """
+        -log(rate * (1 - slippage_per_step)) for every pair, as edge weights for
+        negative-cycle searches; inf on the diagonal and where no usable rate
+        exists. Cached per slippage until the rates change, so treat as read-only.
+        """
+        weights = self._neg_log_cache.get(slippage_per_step)
+        if weights is None:
+            effective = self._matrix * (1 - slippage_per_step)
+            usable = (self._matrix > 0) & (effective > 0)
+            weights = np.full(self._matrix.shape, np.inf)
+            weights[usable] = -np.log(effective[usable])
+            np.fill_diagonal(weights, np.inf)  # Holding a currency is not a trade
+            self._neg_log_cache[slippage_per_step] = weights
+        return weights
+    
+    def is_supported(self, currency: str) -> bool:
+        """Whether currency is in this matrix (a dict probe, not a list scan)"""
+        return currency in self._index
+    
+    def index_of(self, currency: str) -> int:
+        """Row/column of a currency in the rate matrix, for use with convert_fast"""
+        if currency not in self._index:
+            raise ValueError(f"Unsupported currency: {currency}")
+        return self._index[currency]
+    
+    def convert_fast(self, amount: float, from_index: int, to_index: int) -> float:
+        """
+        Convert using indices from index_of, skipping name lookups and validation.
+        Meant for hot loops that resolve their currencies once up front; returns
+        0.0 for pairs without a known rate.
+        """
+        return amount * self._matrix.item(from_index, to_index)
+    
     def set_rates_from_base(self, base_currency: str, base_rates: Dict[str, float]) -> None:
         """
         Set rates using one currency as base. Automatically calculates all pairs.
@@ -211,10 +308,10 @@ class CurrencyRateMatrix:
             base_currency: The currency to use as base (e.g., 'chaos')
             base_rates: Dict of {currency: rate} where rate is how much of that currency you get per 1 base currency
         """
-        # Set direct rates from base currency
-        for currency, rate in base_rates.items():
-            if currency != base_currency:
-                self.set_rate(base_currency, currency, rate)
+        # Set direct rates (and their reciprocals) from base currency in one store
+        self.set_rates_bulk({
+            base_currency: {currency: rate for currency, rate in base_rates.items() if currency != base_currency}
+        })
         
         # Compute transitive rates for all pairs
         self._compute_transitive_rates()
@@ -223,21 +320,58 @@ class CurrencyRateMatrix:
         """
         Compute missing rates using transitive relationships (Floyd-Warshall style).
         If A -> B and B -> C are known, compute A -> C = (A -> B) * (B -> C)
+        
+        Each step k fills every still-unknown pair that connects through k in
+        one vectorized update, so a single sweep over k reaches the closure.
+        Known rates are never overwritten.
+        """
+        rates = self._matrix
+        unknown = rates == 0.0
+        if not unknown.any():
+            return  # Every pair is already quoted
+        
+        # Scratch buffers reused across the sweep instead of fresh temporaries;
+        # the unknown mask is updated as pairs fill instead of re-comparing rates
+        through_k = np.empty_like(rates)
+        filled = np.empty(rates.shape, dtype=bool)
+        for k in range(len(rates)):
+            np.multiply(rates[:, k, None], rates[k, :], out=through_k)
+            np.greater(through_k, 0.0, out=filled)
+            filled &= unknown
+            np.copyto(rates, through_k, where=filled)
+            unknown ^= filled
+            if not unknown.any():
+                break
+        self._rates_cache = None
+        self._neg_log_cache = {}
+        self._price_table_cache = {}
+    
+    def best_triangular_arbitrage(self) -> Optional[Tuple[str, str, str, float]]:
+        """
+        Most profitable cycle A -> B -> C -> A over all currencies.
+        
+        Returns (A, B, C, multiplier) where multiplier is the amount of A you end
+        up with per 1 A, or None if no three distinct currencies form a cycle.
         """
-        currencies = self.SUPPORTED_CURRENCIES
-        
-        # Multiple passes to ensure all transitive relationships are found
-        for _ in range(len(currencies)):
-            for a in currencies:
-                for b in currencies:
-                    for c in currencies:
-                        if (a != b and b != c and a != c and 
-                            self._rates[a][b] > 0 and self._rates[b][c] > 0 and 
-                            self._rates[a][c] == 0):
-                            
-                            computed_rate = self._rates[a][b] * self._rates[b][c]
-                            self._rates[a][c] = computed_rate
-                            self._rates[c][a] = 1.0 / computed_rate
+        rates = self._matrix
+        size = len(rates)
+        if size < 3:
+            return None
+        
+        # cycles[a, b, c] = rate(a -> b) * rate(b -> c) * rate(c -> a)
+        cycles = rates[:, :, None] * rates[None, :, :] * rates.T[:, None, :]
+        
+        # Only cycles through three distinct currencies count
+        eye = np.eye(size, dtype=bool)
+        cycles[eye[:, :, None] | eye[None, :, :] | eye[:, None, :]] = 0.0
+        
+        a, b, c = np.unravel_index(np.argmax(cycles), cycles.shape)
+        multiplier = cycles.item(a, b, c)
+        if multiplier <= 0:
+            return None
+        
+        currencies = list(self._index)
+        return currencies[a], currencies[b], currencies[c], multiplier
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
@@ -250,28 +384,51 @@ class CurrencyRateMatrix:
                 'ttl_seconds': self.metadata.ttl_seconds,
                 'is_expired': self.metadata.is_expired()
             },
-            'rates': self._rates,
+            'rates': self._rates_dict(),
             'currency_names': self.CURRENCY_NAMES
         }
     
+    def _rates_dict(self) -> Dict[str, Dict[str, float]]:
+        """Nested {from: {to: rate}} view of the matrix, rebuilt only after rates change"""
+        if self._rates_cache is None:
+            currencies = list(self._index)
+            self._rates_cache = {
+                from_currency: dict(zip(currencies, row))
+                for from_currency, row in zip(currencies, self._matrix.tolist())
+            }
+        return self._rates_cache
+    
     def get_price_table(self, base_currency: str = 'exalted') -> List[Dict]:
         """
         Get a price table with all currencies relative to base currency.
-        Useful for the "Prices" tab display.
+        Useful for the "Prices" tab display. Cached per base currency until
+        the rates change, so treat the result as read-only.
         """
-        prices = []
-        for currency in self.SUPPORTED_CURRENCIES:
-            if currency != base_currency:
-                rate = self.get_rate(currency, base_currency)
-                prices.append({
-                    'currency': currency,
-                    'name': self.CURRENCY_NAMES[currency],
-                    'price': rate,  # How many base_currency per 1 currency
-                    'formatted_price': f"{rate:.4f}" if rate > 0 else "N/A"
-                })
-        
-        # Sort by price (highest first)
-        prices.sort(key=lambda x: x['price'], reverse=True)
+        if base_currency not in self._index:
+            raise ValueError(f"Unsupported currency: {base_currency}")
+        if base_currency in self._price_table_cache:
+            return self._price_table_cache[base_currency]
+        
+        currencies = list(self._index)
+        base_index = self._index[base_currency]
+        
+        # Prices of every currency in base_currency, sorted highest first
+        column = self._matrix[:, base_index]
+        order = np.argsort(-column, kind='stable')
+        formatted = np.char.mod('%.4f', column).tolist()
+        prices_list = column.tolist()
+        
+        prices = [
+            {
+                'currency': currencies[i],
+                'name': self.CURRENCY_NAMES[currencies[i]],
+                'price': prices_list[i],  # How many base_currency per 1 currency
+                'formatted_price': formatted[i] if prices_list[i] > 0 else "N/A"
+            }
+            for i in order.tolist()
+            if i != base_index
+        ]
+        self._price_table_cache[base_currency] = prices
         return prices
     
     @classmethod
@@ -292,10 +449,10 @@ class CurrencyRateMatrix:
         matrix = cls(metadata)
         
         # Set the direct rates from poe2scout data
-        for from_currency, to_rates in poe2scout_rates.items():
-            for to_currency, rate in to_rates.items():
-                if rate > 0:
-                    matrix.set_rate(from_currency, to_currency, rate)
+        matrix.set_rates_bulk({
+            from_currency: {to_currency: rate for to_currency, rate in to_rates.items() if rate > 0}
+            for from_currency, to_rates in poe2scout_rates.items()
+        })
         
         return matrix
     
@@ -343,9 +500,7 @@ class CurrencyRateMatrix:
             'atalui_bloodletting': {'divine': 11.69}
         }
         
-        for from_currency, to_rates in test_rates.items():
-            for to_currency, rate in to_rates.items():
-                matrix.set_rate(from_currency, to_currency, rate)
+        matrix.set_rates_bulk(test_rates)
         
         matrix._compute_transitive_rates()
         return matrix
@@ -0,0 +1,51 @@
+"""
+Shared Playwright browser for POE2 Scout
+
+Chromium is launched once per event loop and reused; each fetch only opens
+its own short-lived context and page.
+"""
+
+import asyncio
+import weakref
+
+# Playwright and its browser are bound to the loop that started them, so
+# each event loop launches its own: {loop: {'playwright', 'browser', 'lock'}}
+_BROWSERS = weakref.WeakKeyDictionary()
+
+
+def _loop_browser() -> dict:
+    """Return the browser state for the running loop"""
+    loop = asyncio.get_running_loop()
+    state = _BROWSERS.get(loop)
+    if state is None:
+        state = _BROWSERS[loop] = {'playwright': None, 'browser': None, 'lock': asyncio.Lock()}
+    return state
+
+
+async def get_browser():
+    """Return the running loop's headless Chromium, launching it on first use"""
+    # Imported here so processes that never launch a browser skip loading it
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        raise RuntimeError("Playwright is not installed")
+
+    state = _loop_browser()
+    async with state['lock']:
+        browser = state['browser']
+        if browser is None or not browser.is_connected():
+            if state['playwright'] is None:
+                state['playwright'] = await async_playwright().start()
+            state['browser'] = await state['playwright'].chromium.launch(headless=True)
+    return state['browser']
+
+
+async def close_browser() -> None:
+    """Close the running loop's browser and stop its Playwright (call on shutdown)"""
+    state = _BROWSERS.pop(asyncio.get_running_loop(), None)
+    if state is None:
+        return
+    if state['browser'] is not None:
+        await state['browser'].close()
+    if state['playwright'] is not None:
+        await state['playwright'].stop()
@@ -6,28 +6,136 @@ without needing a CORS proxy since it runs server-side.
 """
 
 import re
+import os
+import importlib.util
+import random
+import functools
+import heapq
 import logging
 import json
+import weakref
+from collections import OrderedDict, deque
+from html import unescape
+from types import MappingProxyType
 from typing import Dict, Optional, Tuple, List
 from datetime import datetime
 import httpx
 import asyncio
+import time
 
-# Try to import playwright for browser automation
 try:
-    from playwright.async_api import async_playwright
-    PLAYWRIGHT_AVAILABLE = True
+    import orjson
+    _loads = orjson.loads
 except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+    _loads = json.loads
+
+# Check for playwright without importing it; browser_pool only loads it
+# on the first browser fetch, so API/HTTP-only processes start faster
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
+if not PLAYWRIGHT_AVAILABLE:
     print("⚠️  Playwright not available. Install with: pip install playwright")
 
 try:
     from ..models.rates import CurrencyRateMatrix, RateMetadata
+    from .http_pool import get_scout_client, new_scout_client
+    from .browser_pool import get_browser, close_browser
 except ImportError:
     import sys
-    import os
     sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
     from models.rates import CurrencyRateMatrix, RateMetadata
+    from services.http_pool import get_scout_client, new_scout_client
+    from services.browser_pool import get_browser, close_browser
+
+logger = logging.getLogger(__name__)
+
+def _popularity(item: Tuple[str, Dict]) -> float:
+    """Sort key for (currency_key, metadata) items"""
+    return item[1]['popularity_score']
+
+
+def _trigrams(text: str) -> frozenset:
+    """Distinct 3-character substrings of text"""
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def _build_trigram_index(trigram_sets) -> Dict[str, Tuple[int, ...]]:
+    """Map each trigram to the positions of the entries containing it"""
+    index = {}
+    for position, grams in enumerate(trigram_sets):
+        for gram in grams:
+            index.setdefault(gram, []).append(position)
+    return {gram: tuple(positions) for gram, positions in index.items()}
+
+
+# Resource types the browser scraper never needs to download
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'stylesheet', 'font', 'media'})
+
+# Name cleanup for dynamically generated currency keys
+_APOS_RE = re.compile(r"[''']")
+_SPECIAL_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+# Parsed rate matrices by (league, top_percentage): {key: (fetched_monotonic, matrix)}.
+# League comes from the request and the HTML fallbacks accept any value, so
+# entries are kept oldest-first and expired or surplus ones are dropped on
+# every write (see _store_rates).
+RATES_CACHE_TTL = 90.0
+RATES_CACHE_MAX_KEYS = 32
+_RATES_CACHE = OrderedDict()
+
+def _store_rates(key, matrix) -> None:
+    """Cache a rate matrix, evicting expired entries and the oldest beyond the cap"""
+    now = time.monotonic()
+    _RATES_CACHE[key] = (now, matrix)
+    _RATES_CACHE.move_to_end(key)
+    while _RATES_CACHE:
+        oldest, (fetched_at, _) = next(iter(_RATES_CACHE.items()))
+        if len(_RATES_CACHE) <= RATES_CACHE_MAX_KEYS and now - fetched_at < RATES_CACHE_TTL:
+            break
+        del _RATES_CACHE[oldest]
+
+# Upper bounds on upstream load: distinct fetches running at once, and
+# fetches started per minute
+SCOUT_CONCURRENCY = int(os.getenv('SCOUT_CONCURRENCY', '4'))
+SCOUT_FETCHES_PER_MINUTE = int(os.getenv('SCOUT_FETCHES_PER_MINUTE', '30'))
+
+# Tasks and semaphores only work on the loop that uses them, and the server's
+# loop and SyncPOE2ScoutService's own loop may both fetch, so each loop gets
+# its own: {loop: {'inflight': {key: asyncio.Task}, 'semaphore': asyncio.Semaphore}}.
+# 'inflight' lets concurrent callers for one key share a single upstream request.
+_LOOP_STATE = weakref.WeakKeyDictionary()
+
+
+def _loop_state() -> Dict:
+    """Return the in-flight map and fetch semaphore for the running loop"""
+    loop = asyncio.get_running_loop()
+    state = _LOOP_STATE.get(loop)
+    if state is None:
+        state = _LOOP_STATE[loop] = {'inflight': {}, 'semaphore': asyncio.Semaphore(SCOUT_CONCURRENCY)}
+    return state
+
+
+class _SlidingWindowLimiter:
+    """Allow at most max_calls acquisitions in any window-second span"""
+    
+    def __init__(self, max_calls: int, window: float = 60.0):
+        self.max_calls = max_calls
+        self.window = window
+        self._calls = deque()
+    
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= self.window:
+                self._calls.popleft()
+            
+            if len(self._calls) < self.max_calls:
+                self._calls.append(now)
+                return
+            
+            await asyncio.sleep(self.window - (now - self._calls[0]))
+
+
+_fetch_limiter = _SlidingWindowLimiter(SCOUT_FETCHES_PER_MINUTE)
 
 
 class POE2ScoutService:
@@ -42,37 +150,91 @@ class POE2ScoutService:
     """
     
     BASE_URL = "https://poe2scout.com/exchange"
+    API_URL = "https://poe2scout.com/api/currencyExchange/SnapshotPairs"
     TIMEOUT = 10.0  # 10 second timeout
     MAX_RETRIES = 3
+    MAX_BACKOFF = 30.0
     
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self.session = None
+    # After BREAKER_THRESHOLD consecutive failed fetches (across all callers),
+    # make only a single attempt per fetch until BREAKER_COOLDOWN has passed
+    BREAKER_THRESHOLD = 5
+    BREAKER_COOLDOWN = 60.0
+    _consecutive_failures = 0
+    _breaker_open_until = 0.0
+    
+    # Comprehensive mapping of POE2Scout display names to our internal currency keys
+    NAME_TO_KEY = MappingProxyType({
+        # Core currencies
+        'Divine Orb': 'divine',
+        'Exalted Orb': 'exalted', 
+        'Chaos Orb': 'chaos',
+        
+        # Popular currencies
+        'Mirror of Kalandra': 'mirror',
+        'Perfect Exalted Orb': 'perfect_exalted',
+        'Orb of Annulment': 'orb_annulment',
+        'Orb of Chance': 'orb_chance',
+        'Perfect Chaos Orb': 'perfect_chaos',
+        'Fracturing Orb': 'fracturing_orb',
+        'Greater Exalted Orb': 'greater_exalted',
+        "Perfect Jeweller's Orb": 'perfect_jeweller',
+        'Uncut Skill Gem (Level 20)': 'uncut_gem_20',
+        
+        # Omens
+        'Omen of Light': 'omen_light',
+        'Omen of Homogenising Exaltation': 'omen_homogenising',
+        'Omen of Abyssal Echoes': 'omen_abyssal',
+        'Omen of Whittling': 'omen_whittling',
+        'Omen of Chaotic Rarity': 'omen_chaotic',
+        'Omen of Amelioration': 'omen_amelioration',
+        
+        # Special items
+        "Rakiata's Flow": 'rakiata_flow',
+        'Talisman of Sirrius': 'talisman_sirrius',
+        "Hinekora's Lock": 'hinekora_lock',
+        "Farrul's Rune of the Chase": 'farrul_rune',
+        "Atalui's Bloodletting": 'atalui_bloodletting'
+    })
+    
+    # Lowercased names for the case-insensitive and fuzzy fallbacks in _map_currency_name
+    _NAME_TO_KEY_LOWER_MAP = MappingProxyType({name.lower(): key for name, key in NAME_TO_KEY.items()})
+    _NAME_TO_KEY_LOWER = tuple(_NAME_TO_KEY_LOWER_MAP.items())
+    
+    # Trigram index over the lowercased names, so the fuzzy fallback only
+    # verifies entries that could be a substring of (or contain) the input
+    _NAME_TRIGRAMS = tuple(_trigrams(name) for name, _ in _NAME_TO_KEY_LOWER)
+    _TRIGRAM_INDEX = _build_trigram_index(_NAME_TRIGRAMS)
+    
+    # Table rows/cells of the exchange page, and the text of one row:
+    # "Divine Orb / Exalted Orb 1.00 = 139.48 3,608,138"
+    _TR_RE = re.compile(r'<tr\b[^>]*>(.*?)</tr>', re.DOTALL | re.IGNORECASE)
+    _TD_RE = re.compile(r'<td\b[^>]*>(.*?)</td>', re.DOTALL | re.IGNORECASE)
+    _TAG_RE = re.compile(r'<[^>]+>')
+    _ROW_RE = re.compile(r'^(.+?)\s*/\s*(.+?)\s*1\.00\s*=\s*(\d+(?:\.\d+)?)')
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self.logger = logger
+        # Borrow the pooled client so keep-alive connections survive between calls
+        self.client = client or get_scout_client()
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = httpx.AsyncClient(
-            timeout=httpx.Timeout(self.TIMEOUT),
-            headers={
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'User-Agent': 'Mozilla/5.0 (compatible; poe2-arbitrage-backend/1.0)'
-            }
-        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.aclose()
+        """Async context manager exit (the pooled client stays open)"""
+        pass
     
     async def fetch_currency_rates(self, league: str = "Rise of the Abyssal", 
-                                   top_percentage: float = 0.8) -> CurrencyRateMatrix:
+                                   top_percentage: float = 0.8,
+                                   force_refresh: bool = False) -> CurrencyRateMatrix:
         """
         Fetch current currency rates from POE2 Scout.
         
         Args:
             league: POE2 league name
             top_percentage: Percentage of top currencies to include (0.8 = top 80%)
+            force_refresh: Skip the cached result and fetch from POE2 Scout
             
         Returns:
             CurrencyRateMatrix with current rates
@@ -81,9 +243,47 @@ class POE2ScoutService:
             httpx.RequestError: Network/HTTP errors
             ValueError: Data parsing errors
         """
+        key = (league, round(top_percentage, 2))
+        cached = None if force_refresh else _RATES_CACHE.get(key)
+        if cached and time.monotonic() - cached[0] < RATES_CACHE_TTL:
+            return cached[1]
+        
+        inflight = _loop_state()['inflight']
+        task = inflight.get(key)
+        if task is None:
+            task = inflight[key] = asyncio.ensure_future(self._fetch_and_cache(key, league, top_percentage))
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    async def _fetch_and_cache(self, key: Tuple[str, float], league: str,
+                               top_percentage: float) -> CurrencyRateMatrix:
+        """Fetch live rates and remember them for RATES_CACHE_TTL seconds"""
+        await _fetch_limiter.acquire()
+        async with _loop_state()['semaphore']:
+            matrix = await self._fetch_currency_rates_live(league, top_percentage)
+        
+        _store_rates(key, matrix)
+        return matrix
+    
+    async def _fetch_currency_rates_live(self, league: str, top_percentage: float) -> CurrencyRateMatrix:
+        """Fetch rates from POE2 Scout, bypassing the cache"""
         # LIVE DATA ONLY - Try multiple approaches for live data
         
-        # Approach 1: Browser automation (preferred when available)
+        # Approach 1: The JSON snapshot the exchange page itself is built from
+        try:
+            self.logger.info("📡 Using poe2scout.com JSON API for live data")
+            raw_rates, currency_metadata = await self._fetch_with_api(league)
+            
+            if len(raw_rates) >= 3:
+                self.logger.info(f"✅ API fetch successful: {len(raw_rates)} currency pairs extracted")
+                return self._build_rate_matrix(raw_rates, league, currency_metadata, top_percentage)
+            else:
+                self.logger.warning(f"⚠️ API returned insufficient data: {len(raw_rates)} pairs (need ≥3). Falling back to page scraping.")
+                
+        except Exception as e:
+            self.logger.warning(f"⚠️ API fetch failed: {str(e)}. Falling back to page scraping.")
+        
+        # Approach 2: Browser automation (preferred scraper when available)
         if PLAYWRIGHT_AVAILABLE:
             try:
                 self.logger.info("🎭 Using browser automation for live data extraction")
@@ -100,7 +300,7 @@ class POE2ScoutService:
         else:
             self.logger.info("🌐 Playwright not available in serverless environment. Using HTTP-based live data extraction.")
         
-        # Approach 2: HTTP-based live data extraction (serverless-friendly)
+        # Approach 3: HTTP-based live data extraction (serverless-friendly)
         try:
             self.logger.info("🌐 Using HTTP-based live data extraction from poe2scout.com")
             raw_rates, currency_metadata = await self._fetch_with_http()
@@ -115,123 +315,186 @@ class POE2ScoutService:
             self.logger.error(f"❌ HTTP-based live data extraction failed: {str(e)}")
             raise ValueError(f"Live data extraction failed via both browser and HTTP methods: {str(e)}. No fallback available - live data only mode.")
     
+    async def _fetch_with_api(self, league: str) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict]]:
+        """
+        Fetch trading pairs from the poe2scout.com JSON API.
+        
+        Returns:
+            Tuple of (exchange_rates, currency_metadata), as from _fetch_with_browser
+        """
+        response = await self.client.get(
+            self.API_URL,
+            params={'league': league},
+            headers={'Accept': 'application/json'}
+        )
+        response.raise_for_status()
+        currency_pairs = _loads(response.content)
+        
+        # Reshape into the rows the browser scraper yields; RelativePrice is
+        # how much of currency two one unit of currency one buys
+        trading_pairs = []
+        for position, pair in enumerate(currency_pairs, 1):
+            from_name = (pair.get('CurrencyOne') or {}).get('text')
+            to_name = (pair.get('CurrencyTwo') or {}).get('text')
+            pair_data = pair.get('CurrencyOneData') or {}
+            rate = pair_data.get('RelativePrice') or 0
+            
+            if from_name and to_name and rate > 0:
+                trading_pairs.append({
+                    'from': from_name,
+                    'to': to_name,
+                    'rate': rate,
+                    'volume': pair_data.get('VolumeTraded') or 0,
+                    'position': position
+                })
+        
+        self.logger.info(f"📡 API returned {len(trading_pairs)} priced trading pairs")
+        return self._rates_from_trading_pairs(trading_pairs)
+    
+    def _rates_from_trading_pairs(self, trading_pairs: List[Dict],
+                                  name_stats: Optional[Dict[str, Dict]] = None) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict]]:
+        """Map scraped/API trading pairs to internal keys and build currency metadata"""
+        extracted_rates = {}
+        currency_metadata = {}
+        
+        # Build currency metadata from all discovered currencies
+        if name_stats is None:
+            name_stats = self._aggregate_name_stats(trading_pairs)
+        self._build_currency_metadata(name_stats, currency_metadata)
+        
+        # Convert results to our format
+        for pair in trading_pairs:
+            from_currency = pair['from']
+            to_currency = pair['to']
+            rate = pair['rate']
+            
+            # Map POE2Scout names to our internal currency keys
+            from_key = self._map_currency_name_dynamic(from_currency)
+            to_key = self._map_currency_name_dynamic(to_currency)
+            
+            if from_key and to_key and from_key != to_key:
+                extracted_rates.setdefault(from_key, {})[to_key] = rate
+                
+                self.logger.debug("Mapped: %s (%s) -> %s (%s) = %s", from_currency, from_key, to_currency, to_key, rate)
+        
+        self.logger.info(f"🎭 Successfully mapped {len(extracted_rates)} currency pairs")
+        self.logger.info(f"📊 Discovered {len(currency_metadata)} unique currencies")
+        
+        return extracted_rates, currency_metadata
+    
     async def _fetch_html_with_retry(self) -> str:
-        """Fetch HTML with retry logic"""
+        """Fetch HTML with retry logic (jittered exponential backoff, honours Retry-After)"""
+        cls = POE2ScoutService
         last_error = None
+        attempts = self.MAX_RETRIES
+        if time.monotonic() < cls._breaker_open_until:
+            attempts = 1
+            self.logger.debug("POE2 Scout has been failing; skipping retries until cooldown ends")
         
-        for attempt in range(self.MAX_RETRIES):
+        for attempt in range(attempts):
+            delay = None
             try:
-                self.logger.debug(f"Fetching POE2 Scout data (attempt {attempt + 1}/{self.MAX_RETRIES})")
+                self.logger.debug("Fetching POE2 Scout data (attempt %d/%d)", attempt + 1, attempts)
+                
+                async with self.client.stream('GET', self.BASE_URL) as response:
+                    response.raise_for_status()
+                    html = await self._read_through_table(response)
                 
-                response = await self.session.get(self.BASE_URL)
-                response.raise_for_status()
+                cls._consecutive_failures = 0
+                return html
                 
-                return response.text
+            except httpx.HTTPStatusError as e:
+                last_error = e
+                status = e.response.status_code
+                if status < 500 and status != 429:
+                    # Other client errors won't succeed on retry
+                    self._record_fetch_failure()
+                    raise
+                delay = self._retry_after_seconds(e.response)
+                self.logger.warning(f"Attempt {attempt + 1} failed: HTTP {status}")
                 
             except httpx.RequestError as e:
                 last_error = e
                 self.logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                
-                if attempt < self.MAX_RETRIES - 1:
-                    await asyncio.sleep(1.0 * (attempt + 1))  # Exponential backoff
+            
+            if attempt < attempts - 1:
+                if delay is None:
+                    delay = 2 ** attempt + random.random()
+                await asyncio.sleep(min(self.MAX_BACKOFF, delay))
         
+        self._record_fetch_failure()
         raise last_error or httpx.RequestError("All retry attempts failed")
     
+    @staticmethod
+    async def _read_through_table(response: httpx.Response) -> str:
+        """Read a streamed page only up to the end of the exchange table"""
+        buf = bytearray()
+        async for chunk in response.aiter_bytes():
+            # Search from just before this chunk in case the tag spans chunks
+            start = max(0, len(buf) - 7)
+            buf += chunk
+            if buf.find(b'</table>', start) != -1:
+                break
+        return buf.decode(response.encoding or 'utf-8', errors='replace')
+    
+    @staticmethod
+    def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+        """Delay requested by a 429/503 Retry-After header, if given in seconds"""
+        if response.status_code not in (429, 503):
+            return None
+        try:
+            return max(0.0, float(response.headers['Retry-After']))
+        except (KeyError, ValueError):
+            return None
+    
+    def _record_fetch_failure(self) -> None:
+        """Count a failed fetch and open the breaker once failures pile up"""
+        cls = POE2ScoutService
+        cls._consecutive_failures += 1
+        if cls._consecutive_failures >= self.BREAKER_THRESHOLD:
+            cls._breaker_open_until = time.monotonic() + self.BREAKER_COOLDOWN
+    
     def _parse_trading_pairs(self, html: str) -> Dict[str, Dict[str, float]]:
         """
         Parse trading pairs from POE2 Scout HTML.
         
+        POE2Scout uses this structure:
+        <td>Divine Orb Divine Orb / Exalted Orb Exalted Orb</td>
+        <td>1.00 = 139.48</td>
+        
         Returns:
             Dict of direct trading pairs: {from_currency: {to_currency: rate}}
         """
         rates = {}
         
-        # Comprehensive mapping of POE2Scout names to our internal currency keys
-        name_to_key_mapping = {
-            # Core currencies
-            'Divine Orb': 'divine',
-            'Exalted Orb': 'exalted', 
-            'Chaos Orb': 'chaos',
-            
-            # Popular currencies
-            'Mirror of Kalandra': 'mirror',
-            'Perfect Exalted Orb': 'perfect_exalted',
-            'Orb of Annulment': 'orb_annulment',
-            'Orb of Chance': 'orb_chance',
-            'Perfect Chaos Orb': 'perfect_chaos',
-            'Fracturing Orb': 'fracturing_orb',
-            'Greater Exalted Orb': 'greater_exalted',
-            "Perfect Jeweller's Orb": 'perfect_jeweller',
-            'Uncut Skill Gem (Level 20)': 'uncut_gem_20',
-            
-            # Omens
-            'Omen of Light': 'omen_light',
-            'Omen of Homogenising Exaltation': 'omen_homogenising',
-            'Omen of Abyssal Echoes': 'omen_abyssal',
-            'Omen of Whittling': 'omen_whittling',
-            'Omen of Chaotic Rarity': 'omen_chaotic',
-            'Omen of Amelioration': 'omen_amelioration',
-            
-            # Special items
-            "Rakiata's Flow": 'rakiata_flow',
-            'Talisman of Sirrius': 'talisman_sirrius',
-            "Hinekora's Lock": 'hinekora_lock',
-            "Farrul's Rune of the Chase": 'farrul_rune',
-            "Atalui's Bloodletting": 'atalui_bloodletting'
-        }
-        
-        # Priority trading pairs (highest volume pairs to extract first)
-        priority_pairs = [
-            ('Divine Orb', 'Exalted Orb'),
-            ('Divine Orb', 'Chaos Orb'),
-            ('Chaos Orb', 'Exalted Orb'),
-            ('Mirror of Kalandra', 'Divine Orb'),
-            ('Perfect Exalted Orb', 'Exalted Orb'),
-            ('Orb of Annulment', 'Exalted Orb'),
-            ('Omen of Light', 'Exalted Orb'),
-            ('Omen of Light', 'Divine Orb'),
-        ]
+        # Drop thousands separators once so every rate parses with a bare float()
+        html = html.replace(',', '')
         
         extracted_count = 0
         
-        # First, extract the priority high-volume pairs
-        for from_name, to_name in priority_pairs:
-            if from_name in name_to_key_mapping and to_name in name_to_key_mapping:
-                from_key = name_to_key_mapping[from_name]
-                to_key = name_to_key_mapping[to_name]
+        # One pass over the table rows; each row names its pair and rate
+        for row_match in self._TR_RE.finditer(html):
+            cells = self._TD_RE.findall(row_match.group(1))
+            if len(cells) < 2:
+                continue
+            
+            row_text = ' '.join(unescape(self._TAG_RE.sub(' ', cell)) for cell in cells)
+            match = self._ROW_RE.match(' '.join(row_text.split()))
+            if not match:
+                continue
+            
+            from_name, to_name, rate_str = match.groups()
+            from_key = self.NAME_TO_KEY.get(self._dedupe_cell_name(from_name))
+            to_key = self.NAME_TO_KEY.get(self._dedupe_cell_name(to_name))
+            if not from_key or not to_key or from_key == to_key:
+                continue
+            
+            rate = float(rate_str)
+            if rate > 0:
+                rates.setdefault(from_key, {})[to_key] = rate
+                extracted_count += 1
                 
-                rate = self._extract_trading_pair_rate(html, from_name, to_name)
-                if rate and rate > 0:
-                    if from_key not in rates:
-                        rates[from_key] = {}
-                    rates[from_key][to_key] = rate
-                    extracted_count += 1
-                    
-                    self.logger.debug(f"Extracted: {from_name} → {to_name} = {rate}")
-        
-        # Then try to extract additional pairs from any currency to Exalted (most liquid)
-        for currency_name, currency_key in name_to_key_mapping.items():
-            if currency_key not in ['exalted']:  # Don't extract Exalted -> Exalted
-                rate = self._extract_trading_pair_rate(html, currency_name, 'Exalted Orb')
-                if rate and rate > 0:
-                    if currency_key not in rates:
-                        rates[currency_key] = {}
-                    rates[currency_key]['exalted'] = rate
-                    extracted_count += 1
-                    
-                    self.logger.debug(f"Extracted: {currency_name} → Exalted Orb = {rate}")
-        
-        # Also try Divine Orb pairs (second most liquid)
-        for currency_name, currency_key in name_to_key_mapping.items():
-            if currency_key not in ['divine']:  # Don't extract Divine -> Divine
-                rate = self._extract_trading_pair_rate(html, currency_name, 'Divine Orb')
-                if rate and rate > 0:
-                    if currency_key not in rates:
-                        rates[currency_key] = {}
-                    rates[currency_key]['divine'] = rate
-                    extracted_count += 1
-                    
-                    self.logger.debug(f"Extracted: {currency_name} → Divine Orb = {rate}")
+                self.logger.debug("Extracted: %s → %s = %s", from_name, to_name, rate)
         
         self.logger.info(f"Successfully extracted {extracted_count} trading pairs from POE2Scout")
         
@@ -240,61 +503,14 @@ class POE2ScoutService:
         
         return rates
     
-    def _extract_trading_pair_rate(self, html: str, from_currency: str, to_currency: str) -> Optional[float]:
-        """
-        Extract a specific trading pair rate from HTML.
-        
-        POE2Scout uses this structure:
-        <td>Divine Orb Divine Orb / Exalted Orb Exalted Orb</td>
-        <td>1.00 = 139.48</td>
-        """
-        try:
-            # Pattern 1: Direct pair (from -> to)
-            pair_pattern = rf'{re.escape(from_currency)}.*?/.*?{re.escape(to_currency)}'
-            pair_matches = list(re.finditer(pair_pattern, html, re.DOTALL | re.IGNORECASE))
-            
-            for pair_match in pair_matches:
-                # Look for rate pattern after this pair match
-                remaining_html = html[pair_match.end():pair_match.end() + 500]  # Look ahead 500 chars
-                rate_pattern = r'1\.00.*?=.*?([0-9]+(?:\.[0-9]+)?)'
-                rate_match = re.search(rate_pattern, remaining_html)
-                
-                if rate_match:
-                    rate_str = rate_match.group(1)
-                    self.logger.debug(f"Found direct rate {from_currency} -> {to_currency}: {rate_str}")
-                    return float(rate_str)
-            
-            # Pattern 2: Reverse pair (to -> from) - need to invert
-            pair_pattern = rf'{re.escape(to_currency)}.*?/.*?{re.escape(from_currency)}'
-            pair_matches = list(re.finditer(pair_pattern, html, re.DOTALL | re.IGNORECASE))
-            
-            for pair_match in pair_matches:
-                # Look for rate pattern after this pair match
-                remaining_html = html[pair_match.end():pair_match.end() + 500]  # Look ahead 500 chars
-                rate_pattern = r'1\.00.*?=.*?([0-9]+(?:\.[0-9]+)?)'
-                rate_match = re.search(rate_pattern, remaining_html)
-                
-                if rate_match:
-                    rate_str = rate_match.group(1)
-                    rate = 1.0 / float(rate_str)  # Invert the rate
-                    self.logger.debug(f"Found inverse rate {to_currency} -> {from_currency}: {rate_str}, inverted to: {rate}")
-                    return rate
-            
-            # Pattern 3: Try a more flexible approach - look for both currencies anywhere in a trading row
-            # This catches cases where exact names don't match
-            flexible_pattern = rf'(?=.*{re.escape(from_currency.lower())})(?=.*{re.escape(to_currency.lower())}).*?1\.00.*?=.*?([0-9]+(?:\.[0-9]+)?)'
-            match = re.search(flexible_pattern, html.lower(), re.DOTALL)
-            
-            if match:
-                rate_str = match.group(1)
-                self.logger.debug(f"Found flexible rate {from_currency} <-> {to_currency}: {rate_str}")
-                return float(rate_str)
-                
-        except (ValueError, AttributeError) as e:
-            self.logger.warning(f"Failed to parse rate for {from_currency}/{to_currency}: {str(e)}")
-        
-        self.logger.debug(f"No rate found for {from_currency} -> {to_currency}")
-        return None
+    @staticmethod
+    def _dedupe_cell_name(name: str) -> str:
+        """Collapse a name repeated by icon alt text plus label into one copy"""
+        words = name.split()
+        half = len(words) // 2
+        if len(words) % 2 == 0 and words[:half] == words[half:]:
+            words = words[:half]
+        return ' '.join(words)
     
     async def _fetch_with_http(self) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict]]:
         """
@@ -311,10 +527,11 @@ class POE2ScoutService:
         try:
             # Fetch the HTML content
             html_content = await self._fetch_html_with_retry()
-            self.logger.debug(f"Fetched {len(html_content)} characters of HTML content")
+            self.logger.debug("Fetched %d characters of HTML content", len(html_content))
             
-            # Parse trading pairs from HTML
-            raw_trading_pairs = self._parse_trading_pairs(html_content)
+            # Parse trading pairs from HTML in a worker thread so the event
+            # loop keeps serving other requests while the page is scanned
+            raw_trading_pairs = await asyncio.to_thread(self._parse_trading_pairs, html_content)
             self.logger.info(f"🌐 HTTP extraction found {len(raw_trading_pairs)} raw trading pairs")
             
             # Convert to our format and build metadata
@@ -342,9 +559,7 @@ class POE2ScoutService:
                         continue
                     
                     # Add to extracted rates
-                    if from_key not in extracted_rates:
-                        extracted_rates[from_key] = {}
-                    extracted_rates[from_key][to_key] = rate
+                    extracted_rates.setdefault(from_key, {})[to_key] = rate
                     
                     # Update metadata
                     if to_key not in currency_metadata:
@@ -361,7 +576,7 @@ class POE2ScoutService:
                     currency_metadata[to_key]['pair_count'] += 1
                     pair_count += 1
                     
-                    self.logger.debug(f"HTTP mapped: {from_currency} ({from_key}) -> {to_currency} ({to_key}) = {rate}")
+                    self.logger.debug("HTTP mapped: %s (%s) -> %s (%s) = %s", from_currency, from_key, to_currency, to_key, rate)
             
             # Assign popularity scores based on pair count (more pairs = more popular)
             max_pairs = max([meta['pair_count'] for meta in currency_metadata.values()], default=1)
@@ -376,18 +591,15 @@ class POE2ScoutService:
             self.logger.info(f"🌐 HTTP extraction successful: {len(extracted_rates)} currency pairs, {len(currency_metadata)} currencies discovered")
             
             # Log top currencies by popularity
-            sorted_currencies = sorted(
-                currency_metadata.items(), 
-                key=lambda x: x[1]['popularity_score'], 
-                reverse=True
-            )
-            self.logger.info("🏆 Top HTTP-discovered currencies:")
-            for i, (currency_key, metadata) in enumerate(sorted_currencies[:5]):
-                self.logger.info(
-                    f"  {i+1}. {metadata['name']} ({currency_key}): "
-                    f"pairs={metadata['pair_count']}, "
-                    f"score={metadata['popularity_score']:.1f}"
-                )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("🏆 Top HTTP-discovered currencies:")
+                top_currencies = heapq.nlargest(5, currency_metadata.items(), key=_popularity)
+                for i, (currency_key, metadata) in enumerate(top_currencies):
+                    self.logger.info(
+                        f"  {i+1}. {metadata['name']} ({currency_key}): "
+                        f"pairs={metadata['pair_count']}, "
+                        f"score={metadata['popularity_score']:.1f}"
+                    )
             
             return extracted_rates, currency_metadata
             
@@ -408,165 +620,145 @@ class POE2ScoutService:
             self.logger.warning("⚠️  Playwright not available. Using fallback data.")
             return {}, {}
         
-        extracted_rates = {}
-        currency_metadata = {}
+        # Reuse the shared headless browser; only the context is per-fetch
+        browser = await get_browser()
+        
+        # Set user agent to look like a real browser
+        context = await browser.new_context(
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        )
         
-        async with async_playwright() as p:
-            # Launch browser in headless mode
-            browser = await p.chromium.launch(headless=True)
+        try:
+            # Only documents, scripts and data requests matter for the table
+            await context.route('**/*', self._block_static_assets)
+            page = await context.new_page()
             
-            try:
-                page = await browser.new_page()
-                
-                # Set user agent to look like a real browser
-                await page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                })
-                
-                self.logger.debug(f"Navigating to {self.BASE_URL}")
-                await page.goto(self.BASE_URL, wait_until='domcontentloaded', timeout=15000)
-                
-                # Wait a bit for JavaScript to load the content
-                await page.wait_for_timeout(3000)
-                
-                # Wait for the trading pairs table to load
-                await page.wait_for_selector('table', timeout=10000)
-                self.logger.debug("Table found, extracting trading pairs...")
-                
-                # Extract all trading pairs from the table
-                trading_pairs = await page.evaluate('''
-                    () => {
-                        const pairs = [];
-                        const rows = document.querySelectorAll('table tbody tr');
-                        
-                        rows.forEach((row, index) => {
-                            try {
-                                const cells = row.querySelectorAll('td');
-                                if (cells.length >= 2) {
-                                    // Get the full row text (contains currency pair)
-                                    const fullRowText = row.textContent.trim();
-                                    // Get rate from first cell
-                                    const rateText = cells[0].textContent.trim();
-                                    // Get volume from second cell 
-                                    const volumeText = cells[1].textContent.trim();
-                                    
-                                    console.log(`Row ${index}: Full="${fullRowText}"`);
-                                    console.log(`  Rate cell: "${rateText}"`);
-                                    console.log(`  Volume cell: "${volumeText}"`);
+            self.logger.debug("Navigating to %s", self.BASE_URL)
+            await page.goto(self.BASE_URL, wait_until='domcontentloaded', timeout=15000)
+            
+            # Wait for JavaScript to render the first trading pair row
+            await page.wait_for_selector('table tbody tr', state='attached', timeout=10000)
+            self.logger.debug("Table found, extracting trading pairs...")
+            
+            # Extract all trading pairs from the table, aggregating per-name
+            # volume/count/best position in the same in-page pass
+            extracted = await page.evaluate('''
+                () => {
+                    const pairs = [];
+                    const meta = {};
+                    const rows = document.querySelectorAll('table tbody tr');
+                    
+                    rows.forEach((row, index) => {
+                        try {
+                            const cells = row.querySelectorAll('td');
+                            if (cells.length >= 2) {
+                                // Get the full row text (contains currency pair)
+                                const fullRowText = row.textContent.trim();
+                                // Get rate from first cell
+                                const rateText = cells[0].textContent.trim();
+                                // Get volume from second cell 
+                                const volumeText = cells[1].textContent.trim();
+                                
+                                // Parse format: "Divine Orb/ Exalted Orb1.00 = 139.913,608,138"
+                                // Extract currency pair from the beginning, rate from rate cell
+                                const pairMatch = fullRowText.match(/^(.+?)\\s*\\/\\s*(.+?)1\\.00/);
+                                const rateMatch = rateText.match(/1\\.00\\s*=\\s*([0-9,]+(?:\\.[0-9]+)?)/);
+                                
+                                if (pairMatch && rateMatch) {
+                                    const fromCurrency = pairMatch[1].trim();
+                                    const toCurrency = pairMatch[2].trim();
+                                    const rate = parseFloat(rateMatch[1].replace(/,/g, ''));
                                     
-                                    // Parse format: "Divine Orb/ Exalted Orb1.00 = 139.913,608,138"
-                                    // Extract currency pair from the beginning, rate from rate cell
-                                    const pairMatch = fullRowText.match(/^(.+?)\\s*\\/\\s*(.+?)1\\.00/);
-                                    const rateMatch = rateText.match(/1\\.00\\s*=\\s*([0-9,]+(?:\\.[0-9]+)?)/);
+                                    // Parse volume - extract numeric value from volume text
+                                    let volumeValue = 0;
+                                    const volumeMatch = volumeText.match(/([0-9,]+(?:\\.[0-9]+)?)/);
+                                    if (volumeMatch) {
+                                        volumeValue = parseFloat(volumeMatch[1].replace(/,/g, ''));
+                                    }
                                     
-                                    if (pairMatch && rateMatch) {
-                                        const fromCurrency = pairMatch[1].trim();
-                                        const toCurrency = pairMatch[2].trim();
-                                        const rate = parseFloat(rateMatch[1].replace(/,/g, ''));
-                                        
-                                        console.log(`✅ Parsed: ${fromCurrency} -> ${toCurrency} = ${rate}`);
-                                        
-                                        // Parse volume - extract numeric value from volume text
-                                        let volumeValue = 0;
-                                        const volumeMatch = volumeText.match(/([0-9,]+(?:\\.[0-9]+)?)/);
-                                        if (volumeMatch) {
-                                            volumeValue = parseFloat(volumeMatch[1].replace(/,/g, ''));
-                                        }
+                                    if (rate > 0 && fromCurrency && toCurrency) {
+                                        const position = index + 1;  // Position in the list (higher = more popular)
+                                        pairs.push({from: fromCurrency, to: toCurrency, rate: rate});
                                         
-                                        if (rate > 0 && fromCurrency && toCurrency) {
-                                            pairs.push({
-                                                from: fromCurrency,
-                                                to: toCurrency,
-                                                rate: rate,
-                                                volume: volumeValue,
-                                                volumeText: volumeText,
-                                                position: index + 1  // Position in the list (higher = more popular)
-                                            });
+                                        for (const name of [fromCurrency, toCurrency]) {
+                                            const stats = meta[name] || (meta[name] = {total_volume: 0, pair_count: 0, best_position: position});
+                                            stats.total_volume += volumeValue;
+                                            stats.pair_count += 1;
+                                            stats.best_position = Math.min(stats.best_position, position);
                                         }
-                                    } else {
-                                        console.log(`❌ Failed to parse row ${index}`);
-                                        console.log(`  Pair match: ${pairMatch ? 'YES' : 'NO'}`);
-                                        console.log(`  Rate match: ${rateMatch ? 'YES' : 'NO'}`);
                                     }
                                 }
-                            } catch (e) {
-                                console.log('Error parsing row:', e);
                             }
-                        });
-                        
-                        console.log(`🎯 Total pairs extracted: ${pairs.length}`);
-                        return pairs;
-                    }
-                ''')
-                
-                self.logger.info(f"🎭 Browser automation extracted {len(trading_pairs)} raw trading pairs")
-                
-                # Build currency metadata from all discovered currencies
-                self._build_currency_metadata(trading_pairs, currency_metadata)
-                
-                # Convert browser results to our format
-                for pair in trading_pairs:
-                    from_currency = pair['from']
-                    to_currency = pair['to']
-                    rate = pair['rate']
-                    
-                    # Map POE2Scout names to our internal currency keys
-                    from_key = self._map_currency_name_dynamic(from_currency)
-                    to_key = self._map_currency_name_dynamic(to_currency)
+                        } catch (e) {
+                            console.log('Error parsing row:', e);
+                        }
+                    });
                     
-                    if from_key and to_key and from_key != to_key:
-                        if from_key not in extracted_rates:
-                            extracted_rates[from_key] = {}
-                        extracted_rates[from_key][to_key] = rate
-                        
-                        self.logger.debug(f"Mapped: {from_currency} ({from_key}) -> {to_currency} ({to_key}) = {rate}")
-                
-                self.logger.info(f"🎭 Successfully mapped {len(extracted_rates)} currency pairs")
-                self.logger.info(f"📊 Discovered {len(currency_metadata)} unique currencies")
-                
-            finally:
-                await browser.close()
+                    return {pairs, meta};
+                }
+            ''')
+            trading_pairs = extracted['pairs']
+            
+            self.logger.info(f"🎭 Browser automation extracted {len(trading_pairs)} raw trading pairs")
+            
+        finally:
+            await context.close()
         
-        return extracted_rates, currency_metadata
+        return self._rates_from_trading_pairs(trading_pairs, extracted['meta'])
+    
+    @staticmethod
+    def _aggregate_name_stats(trading_pairs: List[Dict]) -> Dict[str, Dict]:
+        """Per-name volume, pair count and best position (the browser computes this in-page)"""
+        name_stats = {}
+        for pair in trading_pairs:
+            position = pair['position']
+            for currency_name in (pair['from'], pair['to']):
+                stats = name_stats.get(currency_name)
+                if stats is None:
+                    stats = name_stats[currency_name] = {'total_volume': 0, 'pair_count': 0, 'best_position': position}
+                stats['total_volume'] += pair['volume']
+                stats['pair_count'] += 1
+                stats['best_position'] = min(stats['best_position'], position)
+        return name_stats
     
-    def _build_currency_metadata(self, trading_pairs: List[Dict], currency_metadata: Dict[str, Dict]) -> None:
+    @staticmethod
+    async def _block_static_assets(route) -> None:
+        """Playwright route handler that aborts images, stylesheets, fonts and media"""
+        if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    def _build_currency_metadata(self, name_stats: Dict[str, Dict], currency_metadata: Dict[str, Dict]) -> None:
         """
         Build metadata for all discovered currencies including volume analysis.
         
         Args:
-            trading_pairs: List of trading pair data from browser automation
+            name_stats: Per-name total_volume, pair_count and best_position
             currency_metadata: Dict to populate with currency metadata
         """
-        # Track volume and frequency for each currency
-        for pair in trading_pairs:
-            from_currency = pair['from']
-            to_currency = pair['to']
-            volume = pair['volume']
-            position = pair['position']
-            
-            # Update metadata for both currencies in the pair
-            for currency_name in [from_currency, to_currency]:
-                currency_key = self._map_currency_name_dynamic(currency_name)
-                if not currency_key:
-                    continue
-                    
-                if currency_key not in currency_metadata:
-                    currency_metadata[currency_key] = {
-                        'name': currency_name,
-                        'key': currency_key,
-                        'total_volume': 0,
-                        'pair_count': 0,
-                        'best_position': float('inf'),
-                        'avg_position': 0,
-                        'popularity_score': 0
-                    }
+        # Fold per-name stats into per-key metadata
+        for currency_name, stats in name_stats.items():
+            currency_key = self._map_currency_name_dynamic(currency_name)
+            if not currency_key:
+                continue
                 
-                # Update volume and statistics
-                currency_metadata[currency_key]['total_volume'] += volume
-                currency_metadata[currency_key]['pair_count'] += 1
-                currency_metadata[currency_key]['best_position'] = min(
-                    currency_metadata[currency_key]['best_position'], position
-                )
+            if currency_key not in currency_metadata:
+                currency_metadata[currency_key] = {
+                    'name': currency_name,
+                    'key': currency_key,
+                    'total_volume': 0,
+                    'pair_count': 0,
+                    'best_position': float('inf'),
+                    'avg_position': 0,
+                    'popularity_score': 0
+                }
+            
+            # Update volume and statistics
+            metadata = currency_metadata[currency_key]
+            metadata['total_volume'] += stats['total_volume']
+            metadata['pair_count'] += stats['pair_count']
+            metadata['best_position'] = min(metadata['best_position'], stats['best_position'])
         
         # Calculate popularity scores (lower position + higher volume = higher score)
         for currency_key, metadata in currency_metadata.items():
@@ -580,44 +772,41 @@ class POE2ScoutService:
                 
                 metadata['popularity_score'] = volume_score + position_score
         
-        # Sort currencies by popularity score
-        sorted_currencies = sorted(
-            currency_metadata.items(),
-            key=lambda x: x[1]['popularity_score'],
-            reverse=True
-        )
-        
         # Log top currencies for debugging
-        self.logger.info("🏆 Top 10 most popular currencies:")
-        for i, (currency_key, metadata) in enumerate(sorted_currencies[:10]):
-            self.logger.info(
-                f"  {i+1}. {metadata['name']} ({currency_key}): "
-                f"volume={metadata['total_volume']:.0f}, "
-                f"pairs={metadata['pair_count']}, "
-                f"pos={metadata['best_position']}, "
-                f"score={metadata['popularity_score']:.1f}"
-            )
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("🏆 Top 10 most popular currencies:")
+            top_currencies = heapq.nlargest(10, currency_metadata.items(), key=_popularity)
+            for i, (currency_key, metadata) in enumerate(top_currencies):
+                self.logger.info(
+                    f"  {i+1}. {metadata['name']} ({currency_key}): "
+                    f"volume={metadata['total_volume']:.0f}, "
+                    f"pairs={metadata['pair_count']}, "
+                    f"pos={metadata['best_position']}, "
+                    f"score={metadata['popularity_score']:.1f}"
+                )
     
     def _map_currency_name_dynamic(self, poe2scout_name: str) -> Optional[str]:
         """
         Dynamically map POE2Scout currency names to internal keys.
         This creates new keys for unknown currencies instead of ignoring them.
         """
+        return self._map_currency_name_dynamic_cached(poe2scout_name)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _map_currency_name_dynamic_cached(poe2scout_name: str) -> Optional[str]:
+        """Pure name -> key mapping behind _map_currency_name_dynamic, memoized per name"""
         # First try the static mapping for known currencies
-        static_key = self._map_currency_name(poe2scout_name)
+        static_key = POE2ScoutService._map_currency_name(poe2scout_name)
         if static_key:
             return static_key
         
         # For unknown currencies, create a dynamic key
-        # Convert name to snake_case key
-        import re
-        
         # Basic name cleanup and conversion to snake_case
-        name_clean = re.sub(r"[''']", "", poe2scout_name)  # Remove apostrophes
-        name_clean = re.sub(r'[^a-zA-Z0-9\s]', ' ', name_clean)  # Replace special chars with spaces
-        name_clean = re.sub(r'\s+', ' ', name_clean.strip())  # Normalize spaces
+        name_clean = _APOS_RE.sub("", poe2scout_name)  # Remove apostrophes
+        name_clean = _SPECIAL_RE.sub(' ', name_clean)  # Replace special chars with spaces
         
-        # Convert to snake_case
+        # Convert to snake_case (split() also normalizes whitespace)
         words = name_clean.lower().split()
         dynamic_key = '_'.join(words)
         
@@ -627,62 +816,56 @@ class POE2ScoutService:
         if 'omen' in dynamic_key and dynamic_key != 'omen':
             dynamic_key = dynamic_key.replace('omen_of_', 'omen_').strip('_')
         
-        self.logger.debug(f"Dynamic mapping: {poe2scout_name} -> {dynamic_key}")
+        logger.debug("Dynamic mapping: %s -> %s", poe2scout_name, dynamic_key)
         return dynamic_key
     
-    def _map_currency_name(self, poe2scout_name: str) -> Optional[str]:
+    @staticmethod
+    def _map_currency_name(poe2scout_name: str) -> Optional[str]:
         """
         Map POE2Scout currency names to our internal currency keys.
         """
-        # Comprehensive mapping from POE2Scout display names to our keys
-        name_mapping = {
-            # Core currencies
-            'Divine Orb': 'divine',
-            'Exalted Orb': 'exalted', 
-            'Chaos Orb': 'chaos',
-            
-            # Popular currencies
-            'Mirror of Kalandra': 'mirror',
-            'Perfect Exalted Orb': 'perfect_exalted',
-            'Orb of Annulment': 'orb_annulment',
-            'Orb of Chance': 'orb_chance',
-            'Perfect Chaos Orb': 'perfect_chaos',
-            'Fracturing Orb': 'fracturing_orb',
-            'Greater Exalted Orb': 'greater_exalted',
-            "Perfect Jeweller's Orb": 'perfect_jeweller',
-            'Uncut Skill Gem (Level 20)': 'uncut_gem_20',
-            
-            # Omens
-            'Omen of Light': 'omen_light',
-            'Omen of Homogenising Exaltation': 'omen_homogenising',
-            'Omen of Abyssal Echoes': 'omen_abyssal',
-            'Omen of Whittling': 'omen_whittling',
-            'Omen of Chaotic Rarity': 'omen_chaotic',
-            'Omen of Amelioration': 'omen_amelioration',
-            
-            # Special items
-            "Rakiata's Flow": 'rakiata_flow',
-            'Talisman of Sirrius': 'talisman_sirrius',
-            "Hinekora's Lock": 'hinekora_lock',
-            "Farrul's Rune of the Chase": 'farrul_rune',
-            "Atalui's Bloodletting": 'atalui_bloodletting'
-        }
-        
-        # Try exact match first
-        if poe2scout_name in name_mapping:
-            return name_mapping[poe2scout_name]
+        # Try exact match first, then an exact case-insensitive match
+        poe2scout_lower = poe2scout_name.lower()
+        key = (POE2ScoutService.NAME_TO_KEY.get(poe2scout_name)
+               or POE2ScoutService._NAME_TO_KEY_LOWER_MAP.get(poe2scout_lower))
+        if key:
+            return key
         
         # Try case-insensitive partial matches
-        poe2scout_lower = poe2scout_name.lower()
-        for display_name, key in name_mapping.items():
-            if display_name.lower() in poe2scout_lower or poe2scout_lower in display_name.lower():
-                self.logger.debug(f"Fuzzy matched: {poe2scout_name} -> {key}")
+        for position in POE2ScoutService._fuzzy_candidates(poe2scout_lower):
+            display_lower, key = POE2ScoutService._NAME_TO_KEY_LOWER[position]
+            if display_lower in poe2scout_lower or poe2scout_lower in display_lower:
+                logger.debug("Fuzzy matched: %s -> %s", poe2scout_name, key)
                 return key
         
         # Log unmapped currencies for debugging
-        self.logger.debug(f"Unmapped currency: {poe2scout_name}")
+        logger.debug("Unmapped currency: %s", poe2scout_name)
         return None
     
+    @staticmethod
+    def _fuzzy_candidates(poe2scout_lower: str):
+        """
+        Positions in _NAME_TO_KEY_LOWER that may substring-match the name, in mapping order.
+        
+        A substring shares all of its trigrams with the longer string, so an
+        entry qualifies only if every trigram of the entry, or of the name, is
+        shared between the two.
+        """
+        grams = _trigrams(poe2scout_lower)
+        if not grams:
+            return range(len(POE2ScoutService._NAME_TO_KEY_LOWER))
+        
+        shared = {}
+        for gram in grams:
+            for position in POE2ScoutService._TRIGRAM_INDEX.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        
+        name_trigrams = POE2ScoutService._NAME_TRIGRAMS
+        return sorted(
+            position for position, count in shared.items()
+            if count == len(grams) or count == len(name_trigrams[position])
+        )
+    
     def _build_rate_matrix(self, raw_rates: Dict[str, Dict[str, float]], league: str, 
                           currency_metadata: Dict[str, Dict] = None, 
                           top_percentage: float = 0.8) -> CurrencyRateMatrix:
@@ -713,14 +896,22 @@ class POE2ScoutService:
         if currency_metadata:
             matrix._currency_metadata = currency_metadata
         
-        # Set all the direct rates we extracted
-        for from_currency, to_rates in raw_rates.items():
-            for to_currency, rate in to_rates.items():
-                try:
-                    matrix.set_rate(from_currency, to_currency, rate)
-                except ValueError as e:
-                    # Skip unsupported currencies (not in top percentage)
-                    self.logger.debug(f"Skipping unsupported currency rate: {e}")
+        # Set all the direct rates we extracted, skipping unsupported
+        # currencies (not in top percentage) and non-positive rates up front
+        supported = set(matrix.SUPPORTED_CURRENCIES)
+        usable_rates = {
+            from_currency: {
+                to_currency: rate for to_currency, rate in to_rates.items()
+                if to_currency in supported and rate > 0
+            }
+            for from_currency, to_rates in raw_rates.items()
+            if from_currency in supported
+        }
+        if self.logger.isEnabledFor(logging.DEBUG):
+            skipped = (sum(len(to_rates) for to_rates in raw_rates.values())
+                       - sum(len(to_rates) for to_rates in usable_rates.values()))
+            self.logger.debug("Skipping %d unsupported currency rates", skipped)
+        matrix.set_rates_bulk(usable_rates)
         
         # If we don't have enough direct rates, add fallback estimates
         self._add_fallback_rates(matrix)
@@ -739,23 +930,19 @@ class POE2ScoutService:
         Returns:
             List of currency keys for the top currencies
         """
-        # Sort currencies by popularity score
-        sorted_currencies = sorted(
-            currency_metadata.items(),
-            key=lambda x: x[1]['popularity_score'],
-            reverse=True
-        )
-        
         # Calculate how many currencies to include
-        total_currencies = len(sorted_currencies)
+        total_currencies = len(currency_metadata)
         min_currencies = 10  # Always include at least 10 currencies
         max_currencies = 50  # Cap at 50 to avoid UI clutter
         
         target_count = max(min_currencies, int(total_currencies * top_percentage))
         target_count = min(target_count, max_currencies)
         
-        # Get the top currencies
-        top_currencies = [currency_key for currency_key, _ in sorted_currencies[:target_count]]
+        # Get the top currencies by popularity score (at most 50, so no full sort)
+        top_currencies = [
+            currency_key
+            for currency_key, _ in heapq.nlargest(target_count, currency_metadata.items(), key=_popularity)
+        ]
         
         # Always ensure core currencies are included
         core_currencies = ['exalted', 'divine', 'chaos']
@@ -787,9 +974,11 @@ class POE2ScoutService:
                     'ancient': divine_to_exalted * 2.4    # ~2.4x Divine rate
                 }
                 
+                # Setting X → exalted never changes another currency's rate to
+                # exalted, so one snapshot of the column covers every estimate
+                rates_to_exalted = matrix.get_rates_to('exalted')
                 for currency, estimated_rate in estimates.items():
-                    current_rate = matrix.get_rate(currency, 'exalted')
-                    if current_rate <= 0:
+                    if rates_to_exalted.get(currency, 0) <= 0:
                         matrix.set_rate(currency, 'exalted', estimated_rate)
                         self.logger.info(f"Added estimated rate: {currency} → exalted = {estimated_rate}")
                         
@@ -865,16 +1054,42 @@ class SyncPOE2ScoutService:
     """Synchronous wrapper around the async POE2ScoutService"""
     
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
+        # One loop for the wrapper's lifetime instead of asyncio.run per call,
+        # so the client below keeps its pooled connections between calls.
+        # Call close() (or use it as a context manager) when done.
+        self._loop = asyncio.new_event_loop()
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
     
     def fetch_currency_rates(self, league: str = "Rise of the Abyssal") -> CurrencyRateMatrix:
         """Synchronous version of fetch_currency_rates"""
-        return asyncio.run(self._async_fetch(league))
+        return self._loop.run_until_complete(self._async_fetch(league))
+    
+    def close(self) -> None:
+        """Close the client, any browser launched on this wrapper's loop, and the loop"""
+        if self._loop.is_closed():
+            return
+        if self._client is not None:
+            self._loop.run_until_complete(self._client.aclose())
+            self._client = None
+        self._loop.run_until_complete(close_browser())
+        _LOOP_STATE.pop(self._loop, None)
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        self._loop.run_until_complete(self._loop.shutdown_default_executor())
+        self._loop.close()
     
     async def _async_fetch(self, league: str) -> CurrencyRateMatrix:
         """Internal async implementation"""
-        async with POE2ScoutService() as service:
-            return await service.fetch_currency_rates(league)
+        # The shared client may belong to another loop, so use one owned by this wrapper
+        if self._client is None:
+            self._client = new_scout_client()
+        return await POE2ScoutService(self._client).fetch_currency_rates(league)
 
 
 async def main():
@@ -0,0 +1,51 @@
+"""
+Tests for ArbitrageFinder cycle search
+"""
+
+from backend.models.arbitrage import ArbitrageFinder
+from backend.models.rates import CurrencyRateMatrix, RateMetadata
+
+# chaos -> exalted -> chaos taken twice (1.44) beats every simple 4-trade
+# cycle, including chaos -> divine -> mirror -> exalted -> chaos (1.331)
+HIDDEN_CYCLE_RATES = {
+    ('chaos', 'exalted'): 1.2,
+    ('exalted', 'chaos'): 1.0,
+    ('chaos', 'divine'): 1.1,
+    ('divine', 'mirror'): 1.1,
+    ('mirror', 'exalted'): 1.1,
+}
+
+
+def make_matrix(rates):
+    """Rate matrix where every listed rate is set as given (no inverses) and the rest are 0.5"""
+    currencies = ['chaos', 'exalted', 'divine', 'mirror']
+    matrix = CurrencyRateMatrix(RateMetadata(source='test', league='Standard'), currencies)
+    table, index = matrix.as_ndarray()
+    table[:] = 0.5
+    for (from_currency, to_currency), rate in rates.items():
+        table[index[from_currency], index[to_currency]] = rate
+    return matrix
+
+
+def test_repeated_short_cycle_does_not_hide_longer_cycle():
+    matrix = make_matrix(HIDDEN_CYCLE_RATES)
+    finder = ArbitrageFinder(max_steps=4)
+    
+    opportunities = finder.find_opportunities(matrix, 'chaos')
+    paths = [[opportunity.starting_currency] + [step.to_currency for step in opportunity.steps] for opportunity in opportunities]
+    
+    assert paths[:2] == [
+        ['chaos', 'divine', 'mirror', 'exalted', 'chaos'],
+        ['chaos', 'exalted', 'chaos'],
+    ]
+    assert round(opportunities[0].profit_percentage, 1) == 33.1
+    assert round(opportunities[1].profit_percentage, 1) == 20.0
+
+
+def test_cycles_never_exceed_max_steps():
+    matrix = make_matrix(HIDDEN_CYCLE_RATES)
+    finder = ArbitrageFinder(max_steps=2)
+    
+    opportunities = finder.find_opportunities(matrix, 'chaos')
+    
+    assert [len(opportunity.steps) for opportunity in opportunities] == [2]